@@ -2,6 +2,7 @@ from typing import Dict, List, TypedDict, Union
 from nimrod.output_generation.output_generator import OutputGenerator, OutputGeneratorContext
 from nimrod.test_suites_execution.main import TestSuitesExecution
 from os import path
+from nimrod.tests.utils import get_config
 from nimrod.utils import load_json
 import logging
 
@@ -36,20 +37,23 @@ class SemanticConflictsOutputGenerator(OutputGenerator[List[SemanticConflictsOut
                 }
             conflicts_by_suite[suite_path]['conflicts'].append(semantic_conflict)
 
-        # Execute coverage once per suite with all conflicted tests
+        # Execute coverage once per suite with all conflicted tests; without it no exercised targets are reported
         coverage_reports_by_suite = {}
-        for suite_path, suite_data in conflicts_by_suite.items():
-            try:
-                test_cases = [conflict.detected_in.name for conflict in suite_data['conflicts']]
-                coverage_report_root = self._test_suites_execution.execute_test_suite_with_coverage(
-                    test_suite=suite_data['test_suite'],
-                    target_file=context.scenario.scenario_files.merge,
-                    test_cases=test_cases
-                )
-                coverage_reports_by_suite[suite_path] = coverage_report_root
-            except Exception as e:
-                logging.error(f"Error executing test suite with coverage for suite {suite_path}: {e}")
-                coverage_reports_by_suite[suite_path] = None
+        if get_config().get('collect_conflict_coverage', True):
+            for suite_path, suite_data in conflicts_by_suite.items():
+                try:
+                    test_cases = [conflict.detected_in.name for conflict in suite_data['conflicts']]
+                    coverage_report_root = self._test_suites_execution.execute_test_suite_with_coverage(
+                        test_suite=suite_data['test_suite'],
+                        target_file=context.scenario.scenario_files.merge,
+                        test_cases=test_cases
+                    )
+                    coverage_reports_by_suite[suite_path] = coverage_report_root
+                except Exception as e:
+                    logging.error(f"Error executing test suite with coverage for suite {suite_path}: {e}")
+                    coverage_reports_by_suite[suite_path] = None
+        else:
+            logging.info("Skipping coverage of conflicted tests: collect_conflict_coverage is disabled")
 
         # Generate report data for each conflict using the shared coverage report
         for semantic_conflict in context.semantic_conflicts:
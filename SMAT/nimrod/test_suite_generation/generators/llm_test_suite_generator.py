@@ -2,7 +2,7 @@ import logging
 import os
 import ast
 import re
-from typing import List, Dict, Union, Any, Optional
+from typing import List, Dict, Tuple, Union, Any, Optional
 from time import time
 
 from nimrod.core.merge_scenario_under_analysis import MergeScenarioUnderAnalysis
@@ -83,6 +83,9 @@ class PythonTestSuiteGenerator(TestSuiteGenerator):
         self.model_config = model_config or {}
         self.api = None
         self.prompt_manager = PromptManager()
+        # Last parse of each source file, keyed by path and checked against its mtime and size:
+        # path -> (mtime_ns, size, source_code, tree)
+        self._parsed_sources: Dict[str, Tuple[int, int, str, ast.Module]] = {}
 
         # Loads global configurations
         global_config = get_config()
@@ -150,6 +153,17 @@ class PythonTestSuiteGenerator(TestSuiteGenerator):
         config_suffix = self._generate_config_suffix()
         return f"{self.model_key.upper()}{config_suffix}"
     
+    def _get_generation_settings(self) -> Dict[str, Any]:
+        """Model and prompt settings, which shape the generated tests."""
+        self._ensure_api_initialized()
+        assert self.api is not None
+        return {
+            "model_key": self.model_key,
+            "model": self.api.model,
+            "temperature": self.api.temperature,
+            "prompt_template": self.prompt_template
+        }
+
     def _generate_config_suffix(self) -> str:
         """Generates a suffix with configuration information for folder identification"""
         if not self.api:
@@ -238,41 +252,43 @@ class PythonTestSuiteGenerator(TestSuiteGenerator):
             file.write(filled_template)
 
     def parse_code(self, source_code_path: str) -> tuple:
-        """Parse Python source code using AST."""
+        """
+        Parse Python source code using AST.
+        The file is read and parsed again only if it changed since the last call; the returned tree must not be modified.
+        """
+        stat = os.stat(source_code_path)
+        cached = self._parsed_sources.get(source_code_path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2], cached[3]
+
         with open(source_code_path, 'r', encoding='utf-8') as f:
             source_code = f.read()
         tree = ast.parse(source_code)
+        self._parsed_sources[source_code_path] = (stat.st_mtime_ns, stat.st_size, source_code, tree)
         return source_code, tree
 
-    def extract_class_info(self, source_code_path: str, full_method_name: str, full_class_name: str) -> tuple:
+    def extract_class_structure(self, source_code_path: str, full_class_name: str) -> tuple:
         """
-        Extract constructor (__init__) and target method from Python source code.
+        Extract the constructors (__init__) and the other methods of a class with a single AST walk.
+        Returns the constructor sources and the method nodes by name.
         """
-        try:
-            class_name = full_class_name.split('.')[-1]
-            method_name = full_method_name.split('(')[0]
-            
-            source_code, tree = self.parse_code(source_code_path)
-            
-            class_constructors = []
-            class_method = ""
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef) and node.name == class_name:
-                    # Extract only constructor and target method
-                    for item in node.body:
-                        if isinstance(item, ast.FunctionDef):
-                            if item.name == "__init__":
-                                class_constructors.append(ast.unparse(item))
-                            elif item.name == method_name:
-                                class_method = ast.unparse(item)
-                    break
-            
-            return class_constructors, class_method
+        class_name = full_class_name.split('.')[-1]
+        source_code, tree = self.parse_code(source_code_path)
 
-        except Exception as e:
-            logging.error(f"An error occurred while extracting class info for '{full_class_name}': {e}")
-            raise e
+        class_constructors: List[str] = []
+        class_methods: Dict[str, ast.FunctionDef] = {}
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef) and node.name == class_name:
+                for item in node.body:
+                    if isinstance(item, ast.FunctionDef):
+                        if item.name == "__init__":
+                            class_constructors.append(ast.unparse(item))
+                        else:
+                            class_methods[item.name] = item
+                break
+
+        return class_constructors, class_methods
 
     def save_scenario_infos(self, scenario_infos_path: str, class_name: str, methods: Union[List[str], List[Dict[str, str]]], source_code_path: str) -> None:
         """Store relevant scenario information (for each class and method) in a JSON file"""
@@ -284,6 +300,13 @@ class PythonTestSuiteGenerator(TestSuiteGenerator):
         if class_name not in scenario_infos_dict:
             scenario_infos_dict[class_name] = []
 
+        # The class is walked once; each target method is then looked up by name
+        try:
+            constructor_codes, class_methods = self.extract_class_structure(source_code_path, class_name)
+        except Exception as e:
+            logging.error(f"An error occurred while extracting class info for '{class_name}': {e}")
+            raise e
+
         for method_item in methods:
             if not isinstance(method_item, dict):
                 method = method_item
@@ -295,7 +318,8 @@ class PythonTestSuiteGenerator(TestSuiteGenerator):
                 right_changes_summary = method_item.get("rightChangesSummary", "")
 
             method = re.sub(r'\|', ',', method)
-            constructor_codes, method_code = self.extract_class_info(source_code_path, method, class_name)
+            method_node = class_methods.get(method.split('(')[0])
+            method_code = ast.unparse(method_node) if method_node else ""
 
             scenario_infos_dict[class_name].append({
                 'constructor_codes': constructor_codes if constructor_codes else [],
@@ -477,7 +501,7 @@ class PythonTestSuiteGenerator(TestSuiteGenerator):
 
         save_json(time_duration_path, time_duration_dict)
 
-    def _execute_tool_for_tests_generation(self, input_file: str, output_path: str, scenario: MergeScenarioUnderAnalysis, use_determinism: bool) -> None:
+    def _execute_tool_for_tests_generation(self, input_file: str, output_path: str, scenario: MergeScenarioUnderAnalysis, use_determinism: bool) -> bool:
         self._ensure_api_initialized()
 
         # Define paths for storing scenario information, importing data, and recording time duration
@@ -520,6 +544,9 @@ class PythonTestSuiteGenerator(TestSuiteGenerator):
                                       branch=branch, class_name=class_name, imports=imports_dict.get(class_name, []),
                                       i=i, time_duration_path=time_duration_path, project_name=project_name)
 
+        # API errors are raised, so every prompt was answered; answers without valid tests are caught by the suite validation
+        return True
+
     def _process_prompts(self, messages_list: Dict[str, List[Dict[str, str]]], test_template: str, output_path: str, branch: str,
                          class_name: str, imports: List[str], i: int, time_duration_path: str, project_name: str,
                          num_outputs: int = 1) -> None:
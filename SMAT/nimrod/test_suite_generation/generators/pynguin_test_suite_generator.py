@@ -3,7 +3,7 @@ import os
 import re
 import subprocess
 import tempfile
-from typing import List
+from typing import Any, Dict, List
 from pathlib import Path
 import shutil
 
@@ -72,9 +72,13 @@ class PynguinTestSuiteGenerator(TestSuiteGenerator):
         """Return the name of the generator tool."""
         return "pynguin"
 
+    def _get_generation_settings(self) -> Dict[str, Any]:
+        """Search time and Pynguin configuration, which shape the generated tests."""
+        return {"search_time": self.search_time, "pynguin_config": self.pynguin_config}
+
     def _execute_tool_for_tests_generation(self, input_file: str, test_suite_path: str, 
                                          scenario: MergeScenarioUnderAnalysis, 
-                                         use_determinism: bool) -> None:
+                                         use_determinism: bool) -> bool:
         """
         Execute Pynguin to generate tests for the given input file.
         
@@ -83,6 +87,9 @@ class PynguinTestSuiteGenerator(TestSuiteGenerator):
             test_suite_path: Directory where generated tests will be saved
             scenario: Merge scenario under analysis
             use_determinism: Whether to use deterministic generation (affects random seed)
+            
+        Returns:
+            Whether Pynguin ran and its tests were moved to test_suite_path
         """
         logging.info(f"Starting Pynguin test generation for {input_file}")
         
@@ -90,7 +97,7 @@ class PynguinTestSuiteGenerator(TestSuiteGenerator):
         module_info = self._extract_module_info(input_file)
         if not module_info:
             logging.warning(f"Could not extract module information from {input_file}")
-            return
+            return False
         
         project_path, module_name = module_info
         
@@ -145,7 +152,7 @@ class PynguinTestSuiteGenerator(TestSuiteGenerator):
                     logging.error(f"Pynguin failed with return code {result.returncode}")
                     logging.error(f"Stderr: {result.stderr}")
                     logging.error(f"Stdout: {result.stdout}")
-                    return
+                    return False
                 
                 logging.debug(f"Pynguin output: {result.stdout}")
                 
@@ -162,11 +169,13 @@ class PynguinTestSuiteGenerator(TestSuiteGenerator):
                         self._copy_source_file_to_test_dir(test_suite_path, input_file, class_name, self._get_branch_from_input_file(input_file))
                 
                 logging.info(f"Successfully generated tests with Pynguin for {module_name}")
+                return True
                 
             except subprocess.TimeoutExpired:
                 logging.error(f"Pynguin timed out after {self.search_time + 30} seconds")
             except Exception as e:
                 logging.error(f"Error during Pynguin execution: {str(e)}")
+        return False
 
     def _extract_module_info(self, input_file: str) -> tuple:
         """
@@ -270,7 +279,7 @@ class PynguinTestSuiteGenerator(TestSuiteGenerator):
             file_path: Path to the Python file to analyze
             
         Returns:
-            List of class names found in the file
+            List of top-level class names found in the file
         """
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -278,11 +287,8 @@ class PynguinTestSuiteGenerator(TestSuiteGenerator):
             
             import ast
             tree = ast.parse(content)
-            class_names = []
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    class_names.append(node.name)
+            # Only top-level classes can be imported by name, so nested statements are not visited
+            class_names = [node.name for node in tree.body if isinstance(node, ast.ClassDef)]
             
             return class_names
         except Exception as e:
@@ -386,23 +392,6 @@ except ImportError:
         except Exception as e:
             logging.error(f"Error fixing imports in {test_file_path}: {e}")
 
-    def _get_test_suite_class_paths(self, path: str) -> List[str]:
-        """Get all Python test files in a directory (excluding source files) - Pynguin version."""
-        paths: List[str] = []
-        for root, _, files in os.walk(path):
-            for file in files:
-                if file.endswith(".py"):
-                    # Pynguin generates files starting with "test_"
-                    if file.startswith("test_"):
-                        paths.append(os.path.join(root, file))
-        return paths
-
-    def _get_test_suite_class_names(self, test_suite_path: str) -> List[str]:
-        """Get class names from Python test files - Pynguin version."""
-        paths = self._get_test_suite_class_paths(test_suite_path)
-        # For Pynguin, return the filename without extension as the class name
-        return [os.path.basename(path).replace(".py", "") for path in paths]
-
     def _move_generated_tests(self, temp_dir: str, target_dir: str, module_name: str, scenario=None) -> None:
         """
         Move generated test files from Pynguin's temp directory to target directory.
@@ -474,18 +463,20 @@ if __name__ == '__main__':
             List of paths to test files
         """
         paths: List[str] = []
-        test_path = Path(test_suite_path)
         
-        if test_path.exists():
-            for py_file in test_path.rglob('*.py'):
+        # os.walk gets file names from a single directory scan, without a Path object and stat per file
+        for root, _, files in os.walk(test_suite_path):
+            for file in files:
+                if not file.endswith(".py"):
+                    continue
                 # Only include files that are actually test files
-                file_basename = py_file.stem  # Get filename without extension
+                file_basename = file[:-3]  # Get filename without extension
                 if (file_basename.startswith("test_") or 
                     file_basename.endswith("_test") or 
                     file_basename.startswith("Test") or 
                     file_basename.endswith("Test") or
                     "Test_" in file_basename):
-                    paths.append(str(py_file))
+                    paths.append(os.path.join(root, file))
         
         return paths
 
@@ -514,25 +505,3 @@ if __name__ == '__main__':
             if branch in input_file:
                 return branch
         return "unknown"
-
-    def _copy_source_file_to_test_dir(self, output_path: str, source_code_path: str, class_name: str, branch: str) -> None:
-        """Copy source file to test directory with proper naming for imports."""
-        if os.path.exists(source_code_path):
-            # Copy the source file with the class name, but use branch-specific naming for identification
-            dest_path = os.path.join(output_path, f"{class_name.split('.')[-1]}.py")
-            shutil.copy2(source_code_path, dest_path)
-            logging.debug(f"Copied {branch} branch file {source_code_path} to {dest_path}")
-
-    def _copy_all_branch_files_to_test_dir(self, output_path: str, scenario, class_name: str) -> None:
-        """Copy all 4 branch files to test directory with branch-specific names."""
-        branches = ['base', 'left', 'right', 'merge']
-        
-        for branch in branches:
-            source_file = getattr(scenario.scenario_files, branch)
-            if source_file and os.path.exists(source_file):
-                # Copy with branch-specific name: ClassName_branch.py
-                dest_path = os.path.join(output_path, f"{class_name.split('.')[-1]}_{branch}.py")
-                shutil.copy2(source_file, dest_path)
-                logging.debug(f"Copied {branch} branch file {source_file} to {dest_path}")
-            else:
-                logging.warning(f"Branch file not found for {branch}: {source_file}")
\ No newline at end of file
@@ -1,8 +1,14 @@
 from abc import ABC, abstractmethod
+import atexit
+import hashlib
+import json
 import logging
-from os import makedirs, path
+import queue
+import shutil
+import threading
+from os import makedirs, path, remove
 from time import time
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 from nimrod.core.merge_scenario_under_analysis import MergeScenarioUnderAnalysis
 from nimrod.tests.utils import get_base_output_path
@@ -10,6 +16,84 @@ from nimrod.test_suite_generation.test_suite import TestSuite
 
 from nimrod.utils import generate_python_path, save_json, load_json
 
+# Written once a suite is generated without errors and keeps at least one valid test class; marks the directory as safe to reuse
+SUCCESS_MARKER = ".SUCCESS"
+
+# Compilation results are persisted by a background thread, so validation never waits on disk writes.
+# Updates arriving within the flush interval are coalesced into a single read-modify-write per log file.
+COMPILATION_LOG_FLUSH_INTERVAL = 0.5
+_COMPILATION_LOG_QUEUE: "queue.Queue[Optional[Tuple[str, str, str, str]]]" = queue.Queue()
+_compilation_log_writer: Optional[threading.Thread] = None
+_compilation_log_writer_lock = threading.Lock()
+
+
+def _ensure_compilation_log_writer_started() -> None:
+    global _compilation_log_writer
+    with _compilation_log_writer_lock:
+        if _compilation_log_writer is None:
+            _compilation_log_writer = threading.Thread(target=_compilation_log_writer_loop, name="compilation-log-writer", daemon=True)
+            _compilation_log_writer.start()
+            atexit.register(_flush_and_join_compilation_log_writer)
+
+
+def _compilation_log_writer_loop() -> None:
+    running = True
+    while running:
+        item = _COMPILATION_LOG_QUEUE.get()
+        pending: Dict[str, Dict[str, Dict[str, str]]] = {}
+        received = 0
+        deadline = time() + COMPILATION_LOG_FLUSH_INTERVAL
+
+        while True:
+            received += 1
+            if item is None:
+                running = False
+                break
+            log_file, test_suite_path, python_file, output = item
+            pending.setdefault(log_file, {}).setdefault(test_suite_path, {})[python_file] = output
+
+            remaining = deadline - time()
+            if remaining <= 0:
+                break
+            try:
+                item = _COMPILATION_LOG_QUEUE.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+        for log_file, outputs_by_suite in pending.items():
+            try:
+                _write_compilation_results(log_file, outputs_by_suite)
+            except Exception as e:
+                logging.error("Could not write compilation results to %s: %s", log_file, e)
+
+        for _ in range(received):
+            _COMPILATION_LOG_QUEUE.task_done()
+
+
+def _write_compilation_results(log_file: str, outputs_by_suite: Dict[str, Dict[str, str]]) -> None:
+    makedirs(path.dirname(log_file), exist_ok=True)
+
+    if path.exists(log_file):
+        try:
+            compilation_results = load_json(log_file)
+        except FileNotFoundError:
+            compilation_results = {}
+    else:
+        compilation_results = {}
+
+    for test_suite_path, outputs in outputs_by_suite.items():
+        test_suite_entry = compilation_results.setdefault(test_suite_path, {"validation_output": {}})
+        test_suite_entry["validation_output"].update(outputs)
+
+    save_json(log_file, compilation_results, ensure_ascii=False, indent=2)
+
+
+def _flush_and_join_compilation_log_writer() -> None:
+    if _compilation_log_writer is not None and _compilation_log_writer.is_alive():
+        _COMPILATION_LOG_QUEUE.put(None)
+        _compilation_log_writer.join()
+
+
 
 class TestSuiteGenerator(ABC):
 
@@ -19,33 +103,82 @@ class TestSuiteGenerator(ABC):
     def generate_and_compile_test_suite(self, scenario: MergeScenarioUnderAnalysis, input_file: str, use_determinism: bool) -> TestSuite:
         if use_determinism:
             logging.debug('Using deterministic test suite generation')
-            
-        suite_dir = self.get_generator_tool_name() + "_" + str(int(time()))
+            # Deterministic suites are keyed by their inputs, so a previous successful generation can be reused
+            suite_dir = self.get_generator_tool_name() + "_" + self._get_test_suite_digest(scenario, input_file, use_determinism)
+        else:
+            suite_dir = self.get_generator_tool_name() + "_" + str(int(time()))
         test_suite_path = path.join(get_base_output_path(), scenario.project_name, scenario.scenario_commits.merge[:6], suite_dir)
-
+        success_marker = path.join(test_suite_path, SUCCESS_MARKER)
+
+        if use_determinism and path.isfile(success_marker):
+            logging.info(f"Reusing test suite previously generated with {self.get_generator_tool_name()}: {test_suite_path}")
+            return TestSuite(
+                generator_name=self.get_generator_tool_name(),
+                class_path=generate_python_path([test_suite_path]),
+                path=test_suite_path,
+                test_classes_names=self._get_test_suite_class_names(test_suite_path)
+            )
+
+        if use_determinism and path.isdir(test_suite_path):
+            # Files left by an earlier attempt that failed or produced no valid test would be mixed into the new suite
+            logging.info(f"Discarding incomplete test suite previously generated with {self.get_generator_tool_name()}: {test_suite_path}")
+            shutil.rmtree(test_suite_path)
         makedirs(test_suite_path, exist_ok=True)
 
         logging.info(f"Starting generation with {self.get_generator_tool_name()}")
-        self._execute_tool_for_tests_generation(input_file, test_suite_path, scenario, use_determinism)
+        generated = self._execute_tool_for_tests_generation(input_file, test_suite_path, scenario, use_determinism)
         logging.info(f"Finished generation with {self.get_generator_tool_name()}")
 
         logging.info(f"Starting Python test validation for suite generated with {self.get_generator_tool_name()}")
         tests_class_path = self._validate_test_suite(input_file, test_suite_path)
         logging.info(f"Finished Python test validation for suite generated with {self.get_generator_tool_name()}")
 
+        test_classes_names = self._get_test_suite_class_names(test_suite_path)
+        if generated and test_classes_names:
+            with open(success_marker, "w", encoding="utf-8"):
+                pass
+        elif use_determinism:
+            logging.warning(f"Test suite generated with {self.get_generator_tool_name()} is incomplete and will be generated again on the next run: {test_suite_path}")
+
         return TestSuite(
             generator_name=self.get_generator_tool_name(),
             class_path=tests_class_path,
             path=test_suite_path,
-            test_classes_names=self._get_test_suite_class_names(test_suite_path)
+            test_classes_names=test_classes_names
         )
 
+    def _get_test_suite_digest(self, scenario: MergeScenarioUnderAnalysis, input_file: str, use_determinism: bool) -> str:
+        """Hashes everything the generation depends on, so equal inputs map to the same suite directory."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(scenario.project_name).encode())
+        digest.update(str(scenario.scenario_commits.merge or "").encode())
+        digest.update(json.dumps(scenario.targets, sort_keys=True).encode())
+        if path.isfile(input_file):
+            with open(input_file, "rb") as f:
+                digest.update(f.read())
+        # Every branch file is copied into the suite and swapped in at execution time, so a suite with outdated copies must not be reused
+        scenario_files = scenario.scenario_files
+        for branch, branch_file in (("base", scenario_files.base), ("left", scenario_files.left), ("right", scenario_files.right), ("merge", scenario_files.merge)):
+            digest.update(branch.encode())
+            if branch_file and path.isfile(branch_file):
+                with open(branch_file, "rb") as f:
+                    digest.update(hashlib.blake2b(f.read(), digest_size=16).digest())
+        digest.update(self.get_generator_tool_name().encode())
+        digest.update(json.dumps(self._get_generation_settings(), sort_keys=True, default=str).encode())
+        digest.update(str(use_determinism).encode())
+        return digest.hexdigest()
+
+    def _get_generation_settings(self) -> Dict[str, Any]:
+        """Generator settings that change the generated tests; part of the digest of deterministic suites."""
+        return {}
+
     @abstractmethod
     def get_generator_tool_name(self) -> str:
         pass
 
     @abstractmethod
-    def _execute_tool_for_tests_generation(self, input_file: str, test_suite_path: str, scenario: MergeScenarioUnderAnalysis, use_determinism: bool) -> None:
+    def _execute_tool_for_tests_generation(self, input_file: str, test_suite_path: str, scenario: MergeScenarioUnderAnalysis, use_determinism: bool) -> bool:
+        """Generates the test suite into test_suite_path; returns whether the tool finished without errors."""
         pass
 
     @abstractmethod
@@ -57,25 +190,13 @@ class TestSuiteGenerator(ABC):
         pass
 
     def _update_compilation_results(self, test_suite_path: str, python_file: str, output: str) -> None:
-        """Updates the compilation results file with the output of the compilation of a test suite class."""
+        """Queues the output of the compilation of a test suite class to be written to the compilation results file."""
         reports_dir = path.join(path.dirname(get_base_output_path()), "reports")
         COMPILATION_LOG_FILE = path.join(reports_dir, "compilation_results.json")
-        
-        makedirs(reports_dir, exist_ok=True)
 
-        if path.exists(COMPILATION_LOG_FILE):
-            try:
-                compilation_results = load_json(COMPILATION_LOG_FILE)
-            except FileNotFoundError:
-                compilation_results = {}
-        else:
-            compilation_results = {}
-
-        test_suite_entry = compilation_results.setdefault(test_suite_path, {"validation_output": {}})
         safe_output = output.strip() if output.strip() else ""
-        test_suite_entry["validation_output"][python_file] = safe_output
-
-        save_json(COMPILATION_LOG_FILE, compilation_results)
+        _ensure_compilation_log_writer_started()
+        _COMPILATION_LOG_QUEUE.put((COMPILATION_LOG_FILE, test_suite_path, python_file, safe_output))
 
     def _validate_test_suite(self, input_file: str, test_suite_path: str, extra_python_path: List[str] = []) -> str:
         """Validate Python test files for syntax errors"""
@@ -85,21 +206,22 @@ class TestSuiteGenerator(ABC):
         for python_file in self._get_test_suite_class_paths(test_suite_path):
             output = ""
             try:
-                # Simple Python syntax validation using compile()
+                # Compiled in memory, without writing bytecode; parsing alone would miss errors such as a
+                # return outside a function, which the compiler reports as SyntaxError
                 with open(python_file, 'r', encoding='utf-8') as f:
                     source_code = f.read()
-                compile(source_code, python_file, 'exec')
+                compile(source_code, python_file, "exec", dont_inherit=True)
                 logging.debug("Validated syntax for %s successfully.", python_file)
             
             # In case of syntax error, remove the file
             except SyntaxError as e:
                 output = f"Syntax error on line {e.lineno}: {e.msg}"
                 logging.error("Syntax error in %s: %s", python_file, output)
-                path.remove(python_file)
+                remove(python_file)
             except Exception as e:
                 output = f"Unexpected error: {str(e)}"
                 logging.error("Unexpected error validating %s: %s", python_file, output)
-                path.remove(python_file)
+                remove(python_file)
                 
             self._update_compilation_results(test_suite_path, python_file, output)
         
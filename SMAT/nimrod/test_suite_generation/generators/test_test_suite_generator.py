@@ -0,0 +1,101 @@
+import os
+import tempfile
+from typing import List
+from unittest import TestCase
+from unittest.mock import patch
+
+from nimrod.core.merge_scenario_under_analysis import MergeScenarioUnderAnalysis, ScenarioInformation
+from nimrod.test_suite_generation.generators.test_suite_generator import SUCCESS_MARKER, TestSuiteGenerator
+
+
+class FakeTestSuiteGenerator(TestSuiteGenerator):
+    """Writes one test class per generation, without running any tool."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.generations = 0
+
+    def get_generator_tool_name(self) -> str:
+        return "fake"
+
+    def _execute_tool_for_tests_generation(self, input_file, test_suite_path, scenario, use_determinism) -> bool:
+        self.generations += 1
+        with open(os.path.join(test_suite_path, "test_fake.py"), "w", encoding="utf-8") as test_file:
+            test_file.write("def test_fake():\n    assert True\n")
+        return True
+
+    def _get_test_suite_class_paths(self, test_suite_path: str) -> List[str]:
+        # Nothing to validate, so no compilation results are written
+        return []
+
+    def _get_test_suite_class_names(self, test_suite_path: str) -> List[str]:
+        return [name[:-3] for name in os.listdir(test_suite_path) if name.startswith("test_")]
+
+
+class TestTestSuiteGenerator(TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.work_dir.cleanup)
+
+        output_path = patch("nimrod.test_suite_generation.generators.test_suite_generator.get_base_output_path", return_value=os.path.join(self.work_dir.name, "projects"))
+        output_path.start()
+        self.addCleanup(output_path.stop)
+
+        branch_files = {}
+        for branch in ("base", "left", "right", "merge"):
+            branch_files[branch] = os.path.join(self.work_dir.name, f"{branch}.py")
+            self.write_branch_file(branch, "class DiscountCalculator:\n    pass\n")
+
+        self.scenario = MergeScenarioUnderAnalysis(
+            project_name="discount",
+            run_analysis=True,
+            scenario_commits=ScenarioInformation("", "", "", ""),
+            targets={"DiscountCalculator": ["apply"]},
+            scenario_files=ScenarioInformation(**branch_files)
+        )
+
+    def write_branch_file(self, branch: str, content: str) -> None:
+        with open(os.path.join(self.work_dir.name, f"{branch}.py"), "w", encoding="utf-8") as branch_file:
+            branch_file.write(content)
+
+    def test_reuses_a_deterministic_suite_generated_from_the_same_files(self):
+        generator = FakeTestSuiteGenerator()
+
+        first_suite = generator.generate_and_compile_test_suite(self.scenario, self.scenario.scenario_files.left, True)
+        second_suite = generator.generate_and_compile_test_suite(self.scenario, self.scenario.scenario_files.left, True)
+
+        self.assertEqual(first_suite.path, second_suite.path)
+        self.assertTrue(os.path.isfile(os.path.join(first_suite.path, SUCCESS_MARKER)))
+        self.assertEqual(generator.generations, 1)
+
+    def test_changing_a_branch_file_generates_a_new_suite(self):
+        generator = FakeTestSuiteGenerator()
+
+        first_suite = generator.generate_and_compile_test_suite(self.scenario, self.scenario.scenario_files.left, True)
+        self.write_branch_file("merge", "class DiscountCalculator:\n    def apply(self, value):\n        return value\n")
+        second_suite = generator.generate_and_compile_test_suite(self.scenario, self.scenario.scenario_files.left, True)
+
+        self.assertNotEqual(first_suite.path, second_suite.path)
+        self.assertEqual(generator.generations, 2)
+
+    def test_validation_removes_files_the_compiler_rejects(self):
+        generator = FakeTestSuiteGenerator()
+        sources = {
+            "test_valid.py": "def test_valid():\n    assert True\n",
+            "test_unparsable.py": "def test_unparsable(:\n    pass\n",
+            "test_return_outside_function.py": "return 1\n",
+            "test_break_outside_loop.py": "break\n",
+            "test_global_after_assignment.py": "def test_global():\n    x = 1\n    global x\n"
+        }
+        suite_path = os.path.join(self.work_dir.name, "suite")
+        os.makedirs(suite_path)
+        for name, source in sources.items():
+            with open(os.path.join(suite_path, name), "w", encoding="utf-8") as test_file:
+                test_file.write(source)
+
+        with patch.object(generator, "_get_test_suite_class_paths", return_value=[os.path.join(suite_path, name) for name in sources]), \
+                patch.object(generator, "_update_compilation_results") as update_compilation_results:
+            generator._validate_test_suite(self.scenario.scenario_files.left, suite_path)
+
+        self.assertEqual(os.listdir(suite_path), ["test_valid.py"])
+        self.assertEqual(update_compilation_results.call_count, len(sources))
@@ -1,38 +1,52 @@
+import atexit
+import contextlib
+import importlib.util
+import json
 import logging
-import re
+import selectors
 import subprocess
 import os
 import shutil
-from typing import Dict, List
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import IO, BinaryIO, ContextManager, DefaultDict, Dict, Iterator, List, Optional, Set, Tuple
 from nimrod.test_suite_generation.test_suite import TestSuite
 from nimrod.test_suites_execution.test_case_result import TestCaseResult
-from nimrod.tests.utils import get_base_output_path
+from nimrod.tests.utils import get_base_output_path, flush_log_file
 from nimrod.tools.python import Python
 from nimrod.tools.python_coverage import PythonCoverage
-from nimrod.utils import save_json, load_json
+from nimrod.utils import dump_json_line, generate_python_path, save_json, load_json
 
 reports_dir = os.path.join(os.path.dirname(get_base_output_path()), "reports")
 os.makedirs(reports_dir, exist_ok=True)
-EXECUTION_LOG_FILE = os.path.join(reports_dir, "execution_results.json")
+EXECUTION_LOG_FILE = os.path.join(reports_dir, "execution_results.jsonl")
+# Maximum number of recorded executions held in memory before they are appended to the execution log
+EXECUTION_LOG_BATCH_SIZE = 256
+
+# Directory containing the nimrod package, needed on the path of pytest runs that load its plugins
+NIMROD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The pytest worker forks a child per session, which is only possible on POSIX platforms
+USE_PYTEST_WORKER = hasattr(os, "fork")
+# Time the worker has to answer beyond the session's own timeout, which its forked child enforces, before it is considered hung
+WORKER_RESPONSE_MARGIN = 60
+# Looked up once per process instead of on every pytest session
+XDIST_AVAILABLE = importlib.util.find_spec("xdist") is not None
+
+# Literal, case-insensitive error names; matched with substring checks on the casefolded message
+_SYNTAX_ERROR_NAMES = tuple(name.casefold() for name in ("SyntaxError", "ImportError", "ModuleNotFoundError", "NameError", "AttributeError"))
+_ERROR_NAMES = tuple(name.casefold() for name in ("AssertionError", "Exception", "Error"))
 
 def is_failed_caused_by_syntax_error(test_case_name: str, failed_test_message: str) -> bool:
     """Check if failure is caused by syntax or import errors in Python."""
-    error_patterns = [
-        r"SyntaxError", r"ImportError", r"ModuleNotFoundError", 
-        r"NameError", r"AttributeError"
-    ]
-    for pattern in error_patterns:
-        if re.search(pattern, failed_test_message, re.IGNORECASE):
-            return True
-    return False
+    message = failed_test_message.casefold()
+    return any(error_name in message for error_name in _SYNTAX_ERROR_NAMES)
 
 def is_failed_caused_by_error(test_case_name: str, failed_test_message: str) -> bool:
     """Check if failure is caused by actual test error."""
-    error_patterns = [r"AssertionError", r"Exception", r"Error"]
-    for pattern in error_patterns:
-        if re.search(pattern, failed_test_message, re.IGNORECASE):
-            return True
-    return False
+    message = failed_test_message.casefold()
+    return any(error_name in message for error_name in _ERROR_NAMES)
 
 def get_result_for_test_case(failed_test: str, output: str) -> TestCaseResult:
     """Determine test result based on output."""
@@ -51,6 +65,11 @@ class PythonTestSuiteExecutor:
     def __init__(self, python: Python, coverage: PythonCoverage) -> None:
         self._python = python
         self._coverage = coverage
+        self._execution_log_file: Optional[BinaryIO] = None
+        self._worker: Optional[subprocess.Popen] = None
+        self._report_dir: Optional[str] = None
+        # Executors live until SMAT exits, so the worker is stopped and the log closed then
+        atexit.register(self.close)
 
     def execute_test_suite(self, test_suite: TestSuite, target_file: str, number_of_executions: int = 3, branch: str = "") -> Dict[str, TestCaseResult]:
         """
@@ -64,14 +83,17 @@ class PythonTestSuiteExecutor:
         Returns:
             Dictionary mapping test names to their results
         """
-        results: Dict[str, TestCaseResult] = dict()
+        # Every distinct result observed for a test case across executions; more than one means it is flaky
+        outcomes_per_test_case: DefaultDict[str, Set[TestCaseResult]] = defaultdict(set)
 
-        # Load existing log if it exists
-        try:
-            execution_log = load_json(EXECUTION_LOG_FILE, default_value={})
-        except FileNotFoundError:
-            execution_log = {}
+        # One (test_class, test_suite_path, target_file, execution_number, response) tuple per execution;
+        # written to the execution log in batches of at most EXECUTION_LOG_BATCH_SIZE
+        execution_events: List[Tuple[str, str, str, int, Dict[str, TestCaseResult]]] = []
 
+        # The environment only depends on the suite, so it is built once for all classes and executions
+        env = self._get_pytest_env(test_suite)
+
+        test_classes: List[str] = []
         for test_class in test_suite.test_classes_names:
             logging.debug("Test class: %s", test_class)
             
@@ -82,42 +104,65 @@ class PythonTestSuiteExecutor:
                 logging.warning("Test file %s does not exist; skipping execution", test_file_path)
                 continue
 
-            if test_class not in execution_log:
-                execution_log[test_class] = []
+            test_classes.append(test_class)
 
-            # Check if the current test_suite.path is already in the log
-            test_suite_entry = next((entry for entry in execution_log[test_class] if test_suite.path in entry), None)
-            if not test_suite_entry:
-                test_suite_entry = {test_suite.path: {"target_file": {}}}
-                execution_log[test_class].append(test_suite_entry)
+        if not test_classes:
+            logging.warning("No test files found in suite %s; skipping execution", test_suite.path)
+            return {}
 
-            # Ensure the target file is tracked under the current test_suite.path
-            if target_file not in test_suite_entry[test_suite.path]["target_file"]:
-                test_suite_entry[test_suite.path]["target_file"][target_file] = []
+        # Execute tests multiple times; each execution runs every test class in a single pytest session
+        for i in range(0, number_of_executions):
+            logging.info("Starting execution %d of %d test classes from suite %s on %s branch", i + 1, len(test_classes), test_suite.path, branch or "current")
+            responses = self._execute_pytest(test_suite, target_file, test_classes, branch, env)
 
-            # Execute tests multiple times
-            for i in range(0, number_of_executions):
-                logging.info("Starting execution %d of %s from suite %s on %s branch", i + 1, test_class, test_suite.path, branch or "current")
-                response = self._execute_pytest(test_suite, target_file, test_class, branch)
-                logging.debug("RESULTS: %s", response)
+            for test_class, response in responses.items():
+                logging.debug("RESULTS for %s: %s", test_class, response)
                 
                 for test_case, test_case_result in response.items():
-                    test_fqname = f"{test_class}#{test_case}"
-                    if results.get(test_fqname) and results.get(test_fqname) != test_case_result:
-                        results[test_fqname] = TestCaseResult.FLAKY
-                    elif not results.get(test_fqname):
-                        results[test_fqname] = test_case_result
+                    outcomes_per_test_case[f"{test_class}#{test_case}"].add(test_case_result)
+
+                execution_events.append((test_class, test_suite.path, target_file, i + 1, response))
+
+            # Only a bounded number of executions is kept in memory before being written
+            if len(execution_events) >= EXECUTION_LOG_BATCH_SIZE:
+                self._save_execution_log(execution_events)
+                execution_events.clear()
 
-                test_suite_entry[test_suite.path]["target_file"][target_file].append({
-                    "execution_number": i + 1,
-                    "result": {test_case: str(test_case_result) for test_case, test_case_result in response.items()}
-                })
+        results: Dict[str, TestCaseResult] = {
+            test_fqname: TestCaseResult.FLAKY if len(outcomes) > 1 else next(iter(outcomes))
+            for test_fqname, outcomes in outcomes_per_test_case.items()
+        }
 
         # Save execution log
-        save_json(EXECUTION_LOG_FILE, execution_log)
+        self._save_execution_log(execution_events)
+        flush_log_file()
 
         return results
 
+    def _get_pytest_env(self, test_suite: TestSuite) -> Dict[str, str]:
+        """Environment for pytest runs on the suite; installed plugins are not autoloaded, the needed ones are passed with -p."""
+        # The package root keeps the nimrod.tools.pytest_results plugin importable
+        python_path = generate_python_path([test_suite.path, NIMROD_ROOT])
+        # Branch files are linked in place of the class file and keep their own mtime, so bytecode
+        # cached for one branch could be mistaken for another's; it is never written instead
+        return self._python.get_env({'PYTHONPATH': python_path, 'PYTEST_DISABLE_PLUGIN_AUTOLOAD': '1', 'PYTHONDONTWRITEBYTECODE': '1'})
+
+    def _save_execution_log(self, execution_events: List[Tuple[str, str, str, int, Dict[str, TestCaseResult]]]) -> None:
+        """Appends one JSON line per recorded execution to the execution log, without reading back its history."""
+        if self._execution_log_file is None:
+            self._execution_log_file = open(EXECUTION_LOG_FILE, "ab")
+
+        for test_class, test_suite_path, target_file, execution_number, response in execution_events:
+            self._execution_log_file.write(dump_json_line({
+                "test_class": test_class,
+                "test_suite_path": test_suite_path,
+                "target_file": target_file,
+                "execution_number": execution_number,
+                "result": {test_case: str(test_case_result) for test_case, test_case_result in response.items()}
+            }))
+
+        self._execution_log_file.flush()
+
     def _switch_class_file_for_branch(self, test_suite_path: str, class_name: str, branch: str) -> bool:
         """
         Switch the class file to the specified branch version for execution.
@@ -138,10 +183,13 @@ class PythonTestSuiteExecutor:
             # Backup current main file if it exists
             if os.path.exists(main_file):
                 backup_file = os.path.join(test_suite_path, f"{simple_class_name}_backup.py")
-                shutil.move(main_file, backup_file)
+                os.replace(main_file, backup_file)
             
-            # Copy branch file to main file
-            shutil.copy2(branch_file, main_file)
+            # Link branch file to main file; no bytes are copied unless links are unsupported
+            try:
+                os.link(branch_file, main_file)
+            except OSError:
+                shutil.copy2(branch_file, main_file)
             logging.debug(f"Switched to {branch} branch for class {simple_class_name}")
             return True
             
@@ -160,63 +208,193 @@ class PythonTestSuiteExecutor:
             
             # Remove current main file
             if os.path.exists(main_file):
-                os.remove(main_file)
+                os.unlink(main_file)
             
             # Restore from backup if it exists
             if os.path.exists(backup_file):
-                shutil.move(backup_file, main_file)
+                os.replace(backup_file, main_file)
                 
         except Exception as e:
             logging.error(f"Error restoring class file for {class_name}: {e}")
 
-    def _execute_pytest(self, test_suite: TestSuite, target_file: str, test_class: str, branch: str = "", extra_params: List[str] = []) -> Dict[str, TestCaseResult]:
+    def _execute_pytest(self, test_suite: TestSuite, target_file: str, test_classes: List[str], branch: str = "", env: Optional[Dict[str, str]] = None, extra_params: List[str] = []) -> Dict[str, Dict[str, TestCaseResult]]:
         """
-        Execute Python tests using pytest and parse results.
+        Execute the given test classes in a single pytest session and parse the results of each class.
         If branch is specified, switches to that branch version before execution.
         """
+        not_executable = {test_class: {f"test_{test_class}": TestCaseResult.NOT_EXECUTABLE} for test_class in test_classes}
+
         try:
-            # Switch to specific branch if requested
+            # Switch to specific branch if requested; the original class file is restored however the run ends
             if branch:
                 class_name = self._extract_class_name_from_target_file(target_file, test_suite.path)
-                if not self._switch_class_file_for_branch(test_suite.path, class_name, branch):
-                    return {f"test_{test_class}": TestCaseResult.NOT_EXECUTABLE}
-            
-            # Create test execution command using pytest
-            test_file_path = os.path.join(test_suite.path, f"{test_class}.py")
-            
-            # Run pytest with verbose output
-            result = self._python.exec_python(
-                test_suite.path,
-                self._python.get_env({'PYTHONPATH': test_suite.path}),
-                300,
-                '-m', 'pytest', test_file_path, '-v', '--tb=short'
-            )
-            
-            parsed_results = self._parse_pytest_results_from_output(result, test_class)
-            
-            # Restore original class file if we switched branches
-            if branch:
-                self._restore_class_file(test_suite.path, class_name)
-            
-            return parsed_results
-            
-        except subprocess.CalledProcessError as error:
-            output = error.stderr or error.stdout or ""
-            logging.error(f"Pytest execution failed: {output}")
-            
-            # Restore original class file if we switched branches
-            if branch:
-                self._restore_class_file(test_suite.path, class_name)
-                
-            return self._parse_pytest_results_from_output(output, test_class)
+                class_file: ContextManager[bool] = self._class_file_for_branch(test_suite.path, class_name, branch)
+            else:
+                class_file = contextlib.nullcontext(True)
+
+            with class_file as switched:
+                if not switched:
+                    return not_executable
+
+                # Create test execution command using pytest
+                test_file_paths = [os.path.join(test_suite.path, f"{test_class}.py") for test_class in test_classes]
+
+                if env is None:
+                    env = self._get_pytest_env(test_suite)
+
+                # Run pytest on all test files; results are collected per nodeid by a plugin, not from the console output
+                params = [*test_file_paths, '-v', '--tb=short', '-p', 'no:cacheprovider', '--continue-on-collection-errors']
+                if len(test_file_paths) > 1 and XDIST_AVAILABLE:
+                    params += ['-p', 'xdist.plugin', '-n', 'auto']
+
+                if USE_PYTEST_WORKER:
+                    report = self._run_pytest_in_worker(test_suite.path, env, 300 * len(test_classes), params)
+                else:
+                    report = self._run_pytest_with_report(test_suite.path, env, 300 * len(test_classes), params)
+
+            if report is None:
+                return not_executable
+            return {test_class: self._parse_pytest_results_from_report(report, test_class) for test_class in test_classes}
+
         except Exception as e:
             logging.error(f"Unexpected error during pytest execution: {e}")
-            
-            # Restore original class file if we switched branches
-            if branch:
-                self._restore_class_file(test_suite.path, class_name)
-                
-            return {f"test_{test_class}": TestCaseResult.NOT_EXECUTABLE}
+            return not_executable
+
+    @contextlib.contextmanager
+    def _class_file_for_branch(self, test_suite_path: str, class_name: str, branch: str) -> Iterator[bool]:
+        """
+        Switches the class file to the given branch version for the duration of the block.
+        Yields whether the switch succeeded; the original file is restored on exit only if it did.
+        """
+        switched = self._switch_class_file_for_branch(test_suite_path, class_name, branch)
+        try:
+            yield switched
+        finally:
+            if switched:
+                self._restore_class_file(test_suite_path, class_name)
+
+    def _ensure_worker(self) -> Tuple[IO[str], IO[str]]:
+        """Starts the long-lived pytest worker on first use, and again if it has died; returns its stdin and stdout."""
+        if self._worker is None or self._worker.poll() is not None:
+            self._stop_worker()
+            env = self._python.get_env()
+            # The worker is started as a module of this package, so its root must be importable
+            env['PYTHONPATH'] = generate_python_path([NIMROD_ROOT, env.get('PYTHONPATH')])
+            self._worker = subprocess.Popen(
+                [self._python.python_executable, '-u', '-m', 'nimrod.tools.pytest_worker'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                env=env,
+                text=True
+            )
+
+        worker = self._worker
+        # Both pipes are requested when the worker is started
+        assert worker.stdin is not None and worker.stdout is not None
+        return worker.stdin, worker.stdout
+
+    def _run_pytest_in_worker(self, cwd: str, env: Dict[str, str], timeout: int, params: List[str]) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        Runs one pytest session in the worker and returns the outcome of each test by nodeid.
+        Returns None if the worker does not answer in time; it is then killed, and restarted for the next session.
+        """
+        stdin, stdout = self._ensure_worker()
+        stdin.write(json.dumps({"args": params, "cwd": cwd, "env": env, "timeout": timeout}) + "\n")
+        stdin.flush()
+
+        response_timeout = timeout + WORKER_RESPONSE_MARGIN
+        response = self._read_worker_response(stdout, response_timeout)
+        if response is None:
+            logging.error(f"pytest worker did not answer within {response_timeout} seconds; restarting it")
+            self._stop_worker(kill=True)
+            return None
+        if not response:
+            raise RuntimeError("pytest worker exited unexpectedly")
+
+        result = json.loads(response)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result["results"]
+
+    @staticmethod
+    def _read_worker_response(stdout: IO[str], timeout: float) -> Optional[bytes]:
+        """
+        Reads the worker's answer, one line, from its stdout; empty if the worker exited and None if
+        nothing arrived within the timeout. The pipe is read directly, so its text wrapper never buffers anything.
+        """
+        deadline = time.monotonic() + timeout
+        chunks: List[bytes] = []
+        with selectors.DefaultSelector() as selector:
+            selector.register(stdout.fileno(), selectors.EVENT_READ)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    return None
+                chunk = os.read(stdout.fileno(), 1 << 16)
+                chunks.append(chunk)
+                if not chunk or chunk.endswith(b"\n"):
+                    return b"".join(chunks)
+
+    def _stop_worker(self, kill: bool = False) -> None:
+        """Stops the pytest worker, if one was started, and closes its pipes; a hung worker is killed."""
+        worker = self._worker
+        if worker is None:
+            return
+        self._worker = None
+
+        if kill:
+            worker.kill()
+        if worker.stdin is not None:
+            try:
+                worker.stdin.close()
+            except BrokenPipeError:
+                pass
+        worker.wait()
+        if worker.stdout is not None:
+            worker.stdout.close()
+
+    def _run_pytest_with_report(self, cwd: str, env: Dict[str, str], timeout: int, params: List[str]) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        Runs one pytest session in a subprocess and returns the outcome of each test by nodeid,
+        as written by the nimrod.tools.pytest_results plugin.
+        Returns None if pytest ended without writing the report.
+        """
+        report_file = os.path.join(self._get_report_dir(), f"report_{uuid.uuid4().hex}.json")
+        try:
+            # The console output is only read when pytest fails, so it is not decoded otherwise
+            self._python.exec_python(
+                cwd,
+                env,
+                timeout,
+                '-m', 'pytest', *params, '-p', 'nimrod.tools.pytest_results', f'--smat-report={report_file}',
+                decode=False
+            )
+        except subprocess.CalledProcessError as error:
+            # pytest exits with a non-zero code whenever a test fails, so only a missing report is an error
+            if not os.path.exists(report_file):
+                output = (error.stdout or "") + (error.stderr or "")
+                logging.error(f"Pytest execution failed: {output}")
+                return None
+
+        try:
+            return load_json(report_file)
+        finally:
+            os.remove(report_file)
+
+    def _get_report_dir(self) -> str:
+        """Scratch directory for the pytest reports, created on first use and removed when the process exits."""
+        if self._report_dir is None:
+            self._report_dir = tempfile.mkdtemp(prefix='smat_reports_')
+            atexit.register(shutil.rmtree, self._report_dir, ignore_errors=True)
+        return self._report_dir
+
+    def close(self) -> None:
+        """Stops the pytest worker, if one was started, and closes the execution log."""
+        self._stop_worker()
+
+        if self._execution_log_file is not None:
+            self._execution_log_file.close()
+            self._execution_log_file = None
 
     def _extract_class_name_from_target_file(self, target_file: str, test_suite_path: str = "") -> str:
         """Extract class name from target file path."""
@@ -250,57 +428,36 @@ class PythonTestSuiteExecutor:
         logging.debug(f"Executor: target_file={target_file}, extracted class_name={class_name}")
         return class_name
 
-    def _parse_pytest_results_from_output(self, output: str, test_class: str) -> Dict[str, TestCaseResult]:
+    def _parse_pytest_results_from_report(self, report: Dict[str, Dict[str, str]], test_class: str) -> Dict[str, TestCaseResult]:
         """
-        Parse pytest output to determine test results.
+        Map the outcomes collected by the pytest results plugin to the results of a test class.
         """
         results: Dict[str, TestCaseResult] = dict()
-        
-        # pytest patterns
-        # PASSED: test_file.py::test_method PASSED
-        # FAILED: test_file.py::test_method FAILED
-        # ERROR: test_file.py::test_method ERROR
-        
-        # Extract test results from pytest verbose output
-        test_result_pattern = r"(\w+\.py::test_\w+)\s+(PASSED|FAILED|ERROR)"
-        test_results = re.findall(test_result_pattern, output)
-        
-        for test_path, result in test_results:
-            # Extract just the test method name
-            test_method = test_path.split("::")[-1]
-            
-            if result == "PASSED":
-                results[test_method] = TestCaseResult.PASS
-            elif result == "FAILED":
-                if is_failed_caused_by_syntax_error(test_method, output):
-                    results[test_method] = TestCaseResult.NOT_EXECUTABLE
+
+        for nodeid, test_result in report.items():
+            # Only tests of this class's test file; a bare file nodeid is a collection error
+            test_file, _, test_path = nodeid.partition("::")
+            if not test_path or os.path.basename(test_file) != f"{test_class}.py":
+                continue
+
+            # Tests are keyed by their path inside the file (TestClass::test_method), since classes of
+            # the same file may have methods with the same name
+            outcome = test_result["outcome"]
+
+            if outcome == "passed":
+                results[test_path] = TestCaseResult.PASS
+            elif outcome == "failed":
+                if is_failed_caused_by_syntax_error(test_path, test_result["message"]):
+                    results[test_path] = TestCaseResult.NOT_EXECUTABLE
                 else:
-                    results[test_method] = TestCaseResult.FAIL
-            elif result == "ERROR":
-                results[test_method] = TestCaseResult.NOT_EXECUTABLE
-        
-        # If no results found, try alternative parsing
+                    results[test_path] = TestCaseResult.FAIL
+            elif outcome == "error":
+                results[test_path] = TestCaseResult.NOT_EXECUTABLE
+
+        # No test of this class was reported, e.g. its file could not be collected
         if not results:
-            # Look for summary line: "1 passed", "2 failed", etc.
-            summary_pattern = r"(\d+) (passed|failed|error)"
-            summary_matches = re.findall(summary_pattern, output, re.IGNORECASE)
-            
-            if summary_matches:
-                # Create generic test results
-                for count, status in summary_matches:
-                    count = int(count)
-                    for i in range(count):
-                        test_name = f"test_{test_class}_{i}"
-                        if status.lower() == "passed":
-                            results[test_name] = TestCaseResult.PASS
-                        elif status.lower() == "failed":
-                            results[test_name] = TestCaseResult.FAIL
-                        else:
-                            results[test_name] = TestCaseResult.NOT_EXECUTABLE
-            else:
-                # Default fallback
-                results[f"test_{test_class}"] = TestCaseResult.NOT_EXECUTABLE
-            
+            results[f"test_{test_class}"] = TestCaseResult.NOT_EXECUTABLE
+
         return results
 
     def execute_test_suite_with_coverage(self, test_suite: TestSuite, target_file: str, test_cases: List[str]) -> str:
@@ -328,9 +485,9 @@ class PythonTestSuiteExecutor:
             report_dir = os.path.join(test_suite.path, 'coverage_report')
             os.makedirs(report_dir, exist_ok=True)
             
-            # Save unified coverage report as JSON
+            # Save unified coverage report as JSON, written with orjson when available
             coverage_file = os.path.join(report_dir, 'coverage.json')
-            save_json(coverage_file, unified_report)
+            save_json(coverage_file, unified_report, ensure_ascii=False, indent=2)
             
             # Log coverage summary
             if unified_report and 'conflicted_tests_coverage' in unified_report:
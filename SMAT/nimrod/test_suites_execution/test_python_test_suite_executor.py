@@ -0,0 +1,101 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from nimrod.test_suites_execution.python_test_suite_executor import PythonTestSuiteExecutor, USE_PYTEST_WORKER
+from nimrod.test_suites_execution.test_case_result import TestCaseResult
+from nimrod.tools.python import Python
+
+PYTEST_AVAILABLE = importlib.util.find_spec("pytest") is not None
+
+
+class TestPythonTestSuiteExecutor(TestCase):
+    def get_executor(self):
+        executor = PythonTestSuiteExecutor(Python(), None)
+        self.addCleanup(executor.close)
+        return executor
+
+    @skipUnless(PYTEST_AVAILABLE and USE_PYTEST_WORKER, "the pytest worker needs pytest and os.fork")
+    def test_close_stops_the_pytest_worker(self):
+        executor = self.get_executor()
+        with tempfile.TemporaryDirectory() as suite_dir:
+            with open(os.path.join(suite_dir, "test_sample.py"), "w", encoding="utf-8") as test_file:
+                test_file.write("def test_passes():\n    assert True\n")
+
+            results = executor._run_pytest_in_worker(suite_dir, executor._python.get_env(), 60, ["test_sample.py", "-p", "no:cacheprovider"])
+        worker = executor._worker
+
+        executor.close()
+
+        self.assertEqual(results["test_sample.py::test_passes"]["outcome"], "passed")
+        self.assertIsNotNone(worker.poll())
+        self.assertIsNone(executor._worker)
+
+    @skipUnless(USE_PYTEST_WORKER, "the pytest worker needs os.fork")
+    def test_a_worker_that_does_not_answer_in_time_is_killed(self):
+        executor = self.get_executor()
+        # Stands in for a worker hung outside its forked child: it reads nothing and never answers
+        executor._worker = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        hung_worker = executor._worker
+
+        with patch("nimrod.test_suites_execution.python_test_suite_executor.WORKER_RESPONSE_MARGIN", 1):
+            results = executor._run_pytest_in_worker(tempfile.gettempdir(), {}, 0, ["test_sample.py"])
+
+        self.assertIsNone(results)
+        self.assertIsNotNone(hung_worker.poll())
+        self.assertIsNone(executor._worker)
+
+    def test_close_can_be_called_more_than_once(self):
+        executor = self.get_executor()
+
+        executor.close()
+        executor.close()
+
+        self.assertIsNone(executor._worker)
+
+    def test_parses_the_results_of_the_given_test_class_only(self):
+        report = {
+            "DiscountCalculatorTest_0.py::test_apply": {"outcome": "passed", "message": ""},
+            "DiscountCalculatorTest_1.py::test_apply": {"outcome": "failed", "message": "assert 1 == 2"}
+        }
+
+        results = self.get_executor()._parse_pytest_results_from_report(report, "DiscountCalculatorTest_1")
+
+        self.assertEqual(results, {"test_apply": TestCaseResult.FAIL})
+
+    def test_keeps_methods_with_the_same_name_in_different_classes_apart(self):
+        report = {
+            "DiscountCalculatorTest_0.py::TestApply::test_discount": {"outcome": "passed", "message": ""},
+            "DiscountCalculatorTest_0.py::TestApplyTwice::test_discount": {"outcome": "failed", "message": "assert 90 == 81"}
+        }
+
+        results = self.get_executor()._parse_pytest_results_from_report(report, "DiscountCalculatorTest_0")
+
+        self.assertEqual(results, {
+            "TestApply::test_discount": TestCaseResult.PASS,
+            "TestApplyTwice::test_discount": TestCaseResult.FAIL
+        })
+
+    def test_failures_caused_by_import_or_syntax_errors_are_not_executable(self):
+        report = {
+            "DiscountCalculatorTest_0.py::test_import": {"outcome": "failed", "message": "ModuleNotFoundError: No module named 'discount'"},
+            "DiscountCalculatorTest_0.py::test_setup": {"outcome": "error", "message": "fixture 'calculator' not found"}
+        }
+
+        results = self.get_executor()._parse_pytest_results_from_report(report, "DiscountCalculatorTest_0")
+
+        self.assertEqual(results, {
+            "test_import": TestCaseResult.NOT_EXECUTABLE,
+            "test_setup": TestCaseResult.NOT_EXECUTABLE
+        })
+
+    def test_a_test_class_without_reported_tests_is_not_executable(self):
+        report = {"DiscountCalculatorTest_0.py": {"outcome": "error", "message": "SyntaxError: invalid syntax"}}
+
+        results = self.get_executor()._parse_pytest_results_from_report(report, "DiscountCalculatorTest_0")
+
+        self.assertEqual(results, {"test_DiscountCalculatorTest_0": TestCaseResult.NOT_EXECUTABLE})
@@ -1,21 +1,45 @@
+import atexit
+import importlib.util
 import logging
+import os
 import re
+import shutil
 import subprocess
+import tempfile
+import threading
+import uuid
 from os import path, makedirs
-from typing import Dict, List
+from collections import defaultdict, deque
+from typing import DefaultDict, Deque, Dict, List, Optional, Set
 from nimrod.test_suite_generation.test_suite import TestSuite
 from nimrod.test_suites_execution.test_case_result import TestCaseResult
 from nimrod.tests.utils import get_base_output_path
-from nimrod.utils import save_json, load_json
+from nimrod.utils import dump_json_line, generate_python_path, load_json
 
 reports_dir = path.join(path.dirname(get_base_output_path()), "reports")
 makedirs(reports_dir, exist_ok=True)
-EXECUTION_LOG_FILE = path.join(reports_dir, "execution_results.json")
+EXECUTION_LOG_FILE = path.join(reports_dir, "execution_results.jsonl")
+
+# Lines of pytest console output kept for error messages
+PYTEST_OUTPUT_TAIL_LINES = 200
+
+# Directory containing the nimrod package, so pytest can load the nimrod.tools.pytest_results plugin
+NIMROD_ROOT = path.dirname(path.dirname(path.dirname(path.abspath(__file__))))
+# Looked up once per process instead of on every pytest session
+XDIST_AVAILABLE = importlib.util.find_spec("xdist") is not None
+
+# Errors that make a test not executable, searched for only right after the test name
+_IMPORT_PROBLEM_RE = re.compile(r"ImportError|ModuleNotFoundError|AttributeError|NameError")
+IMPORT_PROBLEM_WINDOW = 2048
 
 def is_failed_caused_by_import_problem(test_case_name: str, failed_test_message: str) -> bool:
     """Check if test failed due to import/module issues"""
-    my_regex = re.escape(test_case_name) + r"[0-9A-Za-z0-9_\(\.\)\n \:]+(ImportError|ModuleNotFoundError|AttributeError|NameError)"
-    return re.search(my_regex, failed_test_message) is not None
+    # A bounded, literal window instead of a backtracking character class between name and error
+    start = failed_test_message.find(test_case_name)
+    if start < 0:
+        return False
+    start += len(test_case_name)
+    return _IMPORT_PROBLEM_RE.search(failed_test_message, start, start + IMPORT_PROBLEM_WINDOW) is not None
 
 def is_failed_caused_by_syntax_error(test_case_name: str, failed_test_message: str) -> bool:
     """Check if test failed due to syntax errors"""
@@ -31,16 +55,13 @@ def get_result_for_test_case(failed_test: str, output: str) -> TestCaseResult:
 class TestSuiteExecutor:
     def __init__(self, python_tool=None) -> None:
         self._python = python_tool
+        self._report_dir: Optional[str] = None
 
     def execute_test_suite(self, test_suite: TestSuite, python_file: str, number_of_executions: int = 3) -> Dict[str, TestCaseResult]:
-        results: Dict[str, TestCaseResult] = dict()
-
-        # Load existing log if it exists
-        try:
-            execution_log = load_json(EXECUTION_LOG_FILE, default_value={})
-        except FileNotFoundError:
-            execution_log = {}
+        # Every distinct result observed for a test case across executions; more than one means it is flaky
+        outcomes_per_test_case: DefaultDict[str, Set[TestCaseResult]] = defaultdict(set)
 
+        test_classes: List[str] = []
         for test_class in test_suite.test_classes_names:
             logging.debug("Python test file: %s", test_class)
             test_file_path = path.join(test_suite.path, f"{test_class}.py")
@@ -49,114 +70,129 @@ class TestSuiteExecutor:
                 logging.warning("Python test file %s does not exist; skipping execution", test_file_path)
                 continue
 
-            if test_class not in execution_log:
-                execution_log[test_class] = []
-
-            # Check if the current test_suite.path is already in the log
-            test_suite_entry = next((entry for entry in execution_log[test_class] if test_suite.path in entry), None)
-            if not test_suite_entry:
-                test_suite_entry = {test_suite.path: {"python_file": {}}}
-                execution_log[test_class].append(test_suite_entry)
-
-            # Ensure the Python file is tracked under the current test_suite.path
-            if python_file not in test_suite_entry[test_suite.path]["python_file"]:
-                test_suite_entry[test_suite.path]["python_file"][python_file] = []
-
-            # Append execution results for the current Python file
-            for i in range(0, number_of_executions):
-                logging.info("Starting execution %d of %s from suite %s", i + 1, test_class, test_suite.path)
-                response = self._execute_pytest(test_suite, python_file, test_class)
-                logging.debug("PYTEST RESULTS: %s", response)
-                for test_case, test_case_result in response.items():
-                    test_fqname = f"{test_class}::{test_case}"
-                    if results.get(test_fqname) and results.get(test_fqname) != test_case_result:
-                        results[test_fqname] = TestCaseResult.FLAKY
-                    elif not results.get(test_fqname):
-                        results[test_fqname] = test_case_result
-
-                test_suite_entry[test_suite.path]["python_file"][python_file].append({
-                    "execution_number": i + 1,
-                    "result": {test_case: str(test_case_result) for test_case, test_case_result in response.items()}
-                })
-
-        save_json(EXECUTION_LOG_FILE, execution_log)
+            test_classes.append(test_class)
+
+        # The execution log is append-only: one JSON line per test class and execution
+        with open(EXECUTION_LOG_FILE, "ab") as execution_log:
+            # Append execution results for the current Python file; each execution runs every test class in a single pytest session
+            for i in range(0, number_of_executions if test_classes else 0):
+                logging.info("Starting execution %d of %d Python test files from suite %s", i + 1, len(test_classes), test_suite.path)
+                responses = self._execute_pytest(test_suite, python_file, test_classes)
+
+                for test_class, response in responses.items():
+                    logging.debug("PYTEST RESULTS for %s: %s", test_class, response)
+                    for test_case, test_case_result in response.items():
+                        outcomes_per_test_case[f"{test_class}::{test_case}"].add(test_case_result)
+
+                    execution_log.write(dump_json_line({
+                        "test_class": test_class,
+                        "test_suite_path": test_suite.path,
+                        "python_file": python_file,
+                        "execution_number": i + 1,
+                        "result": {test_case: str(test_case_result) for test_case, test_case_result in response.items()}
+                    }))
+
+        results: Dict[str, TestCaseResult] = {
+            test_fqname: TestCaseResult.FLAKY if len(outcomes) > 1 else next(iter(outcomes))
+            for test_fqname, outcomes in outcomes_per_test_case.items()
+        }
 
         return results
 
-    def _execute_pytest(self, test_suite: TestSuite, target_file: str, test_class: str, extra_params: List[str] = []) -> Dict[str, TestCaseResult]:
-        """Execute pytest on Python test files"""
+    def _execute_pytest(self, test_suite: TestSuite, target_file: str, test_classes: List[str], extra_params: List[str] = []) -> Dict[str, Dict[str, TestCaseResult]]:
+        """Execute pytest once on all given Python test files and parse the results of each file"""
         try:
-            test_file_path = path.join(test_suite.path, f"{test_class}.py")
-            
-            # Basic pytest command
-            params = ['pytest', test_file_path, '-v', '--tb=short'] + extra_params
+            test_file_paths = [path.join(test_suite.path, f"{test_class}.py") for test_class in test_classes]
+
+            report_file = path.join(self._get_report_dir(), f"report_{uuid.uuid4().hex}.json")
+
+            # Basic pytest command; the results plugin writes the outcome of every test to the report file
+            params = ['pytest', *test_file_paths, '-v', '--tb=short', '-p', 'no:cacheprovider', '--continue-on-collection-errors',
+                      '-p', 'nimrod.tools.pytest_results', f'--smat-report={report_file}']
+
+            # Spread the test files over all cores when pytest-xdist is available
+            if len(test_file_paths) > 1 and XDIST_AVAILABLE:
+                params += ['-p', 'xdist.plugin', '-n', 'auto']
+            params += extra_params
             
-            # Execute pytest
-            result = subprocess.run(
+            # Execute pytest without autoloading unrelated installed plugins
+            with subprocess.Popen(
                 params,
                 cwd=test_suite.path,
-                capture_output=True,
+                env={**os.environ, 'PYTEST_DISABLE_PLUGIN_AUTOLOAD': '1', 'PYTHONPATH': generate_python_path([os.environ.get('PYTHONPATH'), NIMROD_ROOT])},
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
-                timeout=300  # 5 minute timeout
-            )
-            
-            output = result.stdout + result.stderr
-            return self._parse_pytest_results_from_output(output, test_class)
-            
+                bufsize=1
+            ) as process:
+                # Results come from the report file, so the console output is streamed and only its tail is kept for error messages
+                timeout = 300 * len(test_classes)  # 5 minute timeout per test file
+                timed_out = threading.Event()
+
+                def kill_on_timeout() -> None:
+                    timed_out.set()
+                    process.kill()
+
+                watchdog = threading.Timer(timeout, kill_on_timeout)
+                watchdog.start()
+                try:
+                    output_tail: Deque[str] = deque(process.stdout, maxlen=PYTEST_OUTPUT_TAIL_LINES)
+                    process.wait()
+                finally:
+                    watchdog.cancel()
+
+            # Only a kill by the watchdog is a timeout; other signals (a crash, the OOM killer) are not
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(params, timeout)
+            if process.returncode < 0:
+                logging.error("Pytest was killed by signal %d for %s: %s", -process.returncode, ", ".join(test_classes), "".join(output_tail))
+                return {test_class: {"test_error": TestCaseResult.NOT_EXECUTABLE} for test_class in test_classes}
+
+            if not path.exists(report_file):
+                logging.error("Pytest did not report any result for %s: %s", ", ".join(test_classes), "".join(output_tail))
+                return {test_class: {"test_default": TestCaseResult.NOT_EXECUTABLE} for test_class in test_classes}
+
+            report = load_json(report_file)
+            # Reports left behind by failed sessions are removed with the scratch directory at exit
+            os.remove(report_file)
+            return {test_class: self._parse_pytest_results_from_report(report, test_class) for test_class in test_classes}
+        
         except subprocess.TimeoutExpired:
-            logging.error("Pytest execution timed out for %s", test_class)
-            return {"test_timeout": TestCaseResult.NOT_EXECUTABLE}
-        except subprocess.CalledProcessError as error:
-            output = error.stdout + error.stderr if error.stdout or error.stderr else str(error)
-            return self._parse_pytest_results_from_output(output, test_class)
+            logging.error("Pytest execution timed out for %s", ", ".join(test_classes))
+            return {test_class: {"test_timeout": TestCaseResult.NOT_EXECUTABLE} for test_class in test_classes}
         except Exception as e:
-            logging.error("Unexpected error executing pytest for %s: %s", test_class, str(e))
-            return {"test_error": TestCaseResult.NOT_EXECUTABLE}
-
-    def _parse_pytest_results_from_output(self, output: str, test_class: str) -> Dict[str, TestCaseResult]:
-        """Parse pytest output to extract test results"""
+            logging.error("Unexpected error executing pytest for %s: %s", ", ".join(test_classes), str(e))
+            return {test_class: {"test_error": TestCaseResult.NOT_EXECUTABLE} for test_class in test_classes}
+
+    def _get_report_dir(self) -> str:
+        """Scratch directory for the pytest reports, created on first use and removed when the process exits"""
+        if self._report_dir is None:
+            self._report_dir = tempfile.mkdtemp(prefix='smat_reports_')
+            atexit.register(shutil.rmtree, self._report_dir, ignore_errors=True)
+        return self._report_dir
+
+    def _parse_pytest_results_from_report(self, report: Dict[str, Dict[str, str]], test_class: str) -> Dict[str, TestCaseResult]:
+        """Map the outcomes collected by the pytest results plugin to the test results of a Python test file"""
         results: Dict[str, TestCaseResult] = dict()
         
-        # Parse pytest output patterns
-        # Look for individual test results: test_file.py::test_function PASSED/FAILED/ERROR
-        test_pattern = rf"{re.escape(test_class)}\.py::(test_\w+)\s+(PASSED|FAILED|ERROR|SKIPPED)"
-        matches = re.findall(test_pattern, output)
-        
-        for test_name, result in matches:
-            if result == "PASSED":
-                results[test_name] = TestCaseResult.PASS
-            elif result == "FAILED":
-                results[test_name] = get_result_for_test_case(test_name, output)
-            elif result == "ERROR":
-                results[test_name] = TestCaseResult.NOT_EXECUTABLE
-            elif result == "SKIPPED":
-                results[test_name] = TestCaseResult.NOT_EXECUTABLE
-        
-        # If no individual tests found, look for summary
-        if not results:
-            # Look for pytest summary: "X passed", "X failed", etc.
-            summary_pattern = r"(\d+) (passed|failed|error|skipped)"
-            summary_matches = re.findall(summary_pattern, output)
-            
-            total_tests = 0
-            failed_tests = 0
-            
-            for count, status in summary_matches:
-                count = int(count)
-                total_tests += count
-                if status in ['failed', 'error']:
-                    failed_tests += count
-            
-            # Generate generic test names if we know the count
-            if total_tests > 0:
-                for i in range(total_tests):
-                    test_name = f"test_{i:02d}"
-                    if i < failed_tests:
-                        results[test_name] = TestCaseResult.FAIL
-                    else:
-                        results[test_name] = TestCaseResult.PASS
+        for nodeid, test_result in report.items():
+            # Look for individual test results of this file: test_file.py::TestClass::test_function
+            test_file, _, test_path = nodeid.partition("::")
+            if not test_path or path.basename(test_file) != f"{test_class}.py":
+                continue
+
+            # Keyed by the path inside the file (TestClass::test_method), as classes of the same file may share method names
+            outcome = test_result["outcome"]
+            if outcome == "passed":
+                results[test_path] = TestCaseResult.PASS
+            elif outcome == "failed":
+                results[test_path] = get_result_for_test_case(test_path, f"{test_path} - {test_result['message']}")
+            elif outcome == "error":
+                results[test_path] = TestCaseResult.NOT_EXECUTABLE
+            elif outcome == "skipped":
+                results[test_path] = TestCaseResult.NOT_EXECUTABLE
         
-        # If still no results, mark as not executable
+        # If no test of this file was reported (e.g. it could not be collected), mark as not executable
         if not results:
             results["test_default"] = TestCaseResult.NOT_EXECUTABLE
             
@@ -182,6 +218,8 @@ class TestSuiteExecutor:
             
             coverage_params = [
                 'pytest',
+                '-p', 'pytest_cov.plugin',            # Plugin autoloading is disabled below
+                '-p', 'no:cacheprovider',
                 '--cov=' + path.dirname(target_file),  # Coverage source directory
                 '--cov-report=html:' + report_dir,     # HTML report output
                 '--cov-report=term',                   # Terminal output
@@ -192,6 +230,7 @@ class TestSuiteExecutor:
             result = subprocess.run(
                 coverage_params,
                 cwd=test_suite.path,
+                env={**os.environ, 'PYTEST_DISABLE_PLUGIN_AUTOLOAD': '1'},
                 capture_output=True,
                 text=True,
                 timeout=600  # 10 minute timeout for coverage
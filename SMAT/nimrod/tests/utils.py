@@ -1,20 +1,89 @@
+import atexit
+import functools
 import logging
 import logging.handlers
 import os
+import queue
 from json import JSONDecodeError
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from nimrod.utils import load_json
 
 PATH = os.path.dirname(os.path.abspath(__file__))
 
+# Writes queued log records to the log file on a background thread; replaced on every setup_logging call
+_file_log_listener: Optional[logging.handlers.QueueListener] = None
 
+
+# Read once per process; callers share the returned config and must not modify it
+@functools.lru_cache(maxsize=1)
 def get_config() -> Dict[str, Any]:
     config_path = os.path.join(PATH, "env-config.json")
     return load_json(config_path)
 
 
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that writes through a 64 KiB buffer. Instead of after every
+    record, it flushes every FLUSH_EVERY_RECORDS records, on warnings and errors,
+    and on an explicit flush() or close().
+    """
+
+    BUFFER_SIZE = 1 << 16
+    FLUSH_EVERY_RECORDS = 256
+
+    def __init__(self, *args, **kwargs):
+        self._stream_size = 0
+        self._record_size = 0
+        self._records_since_flush = 0
+        self._flush_now = True
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=self.BUFFER_SIZE, encoding=self.encoding, errors=self.errors)
+        self._stream_size = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def shouldRollover(self, record):
+        # The base class seeks to the end of the file to get its size, which flushes the buffer on every record
+        self._record_size = 0
+        if os.path.exists(self.baseFilename) and not os.path.isfile(self.baseFilename):
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        # maxBytes is a size in bytes, so the record is measured as it is written to the file
+        self._record_size = len((self.format(record) + self.terminator).encode(self.encoding or "utf-8", self.errors or "strict"))
+        return self.maxBytes > 0 and self._stream_size + self._record_size >= self.maxBytes
+
+    def emit(self, record):
+        self._records_since_flush += 1
+        self._flush_now = record.levelno >= logging.WARNING or self._records_since_flush >= self.FLUSH_EVERY_RECORDS
+        try:
+            super().emit(record)
+            self._stream_size += self._record_size
+        finally:
+            self._flush_now = True
+
+    def flush(self):
+        # StreamHandler.emit flushes after every record; emit() decides which of those reach the file.
+        # The lock is reentrant, so flushes from emit() and explicit ones from other threads are both serialized
+        with self.lock:
+            if self._flush_now:
+                self._records_since_flush = 0
+                super().flush()
+
+
+def _stop_file_log_listener() -> None:
+    """Writes out the queued log records, stops the file log listener and closes its handlers, if one is running."""
+    global _file_log_listener
+    if _file_log_listener is not None:
+        _file_log_listener.stop()
+        for handler in _file_log_listener.handlers:
+            handler.close()
+        _file_log_listener = None
+
+
 def setup_logging():
     try:
         config = get_config()
@@ -29,6 +98,7 @@ def setup_logging():
 
     if logger.hasHandlers():
         logger.handlers.clear()
+    _stop_file_log_listener()
 
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
@@ -45,7 +115,7 @@ def setup_logging():
 
     try:
         main_log_file = log_dir / "smat_nimrod.log"
-        main_handler = logging.handlers.RotatingFileHandler(
+        main_handler = BufferedRotatingFileHandler(
             main_log_file,
             maxBytes=50 * 1024 * 1024,  # 50MB
             backupCount=5,
@@ -53,13 +123,23 @@ def setup_logging():
         )
         main_handler.setLevel(logging.DEBUG)
         main_handler.setFormatter(detailed_formatter)
-        logger.addHandler(main_handler)
+        file_handler: logging.Handler = main_handler
     except (OSError, PermissionError):
         fallback_log = log_dir / f"smat_nimrod_{datetime.now().strftime('%Y%m%d')}.log"
         fallback_handler = logging.FileHandler(fallback_log, mode='a', encoding='utf-8')
         fallback_handler.setLevel(logging.DEBUG)
         fallback_handler.setFormatter(detailed_formatter)
-        logger.addHandler(fallback_handler)
+        file_handler = fallback_handler
+
+    # Logging calls only enqueue records; the listener thread does the file writes
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setLevel(logging.DEBUG)
+    logger.addHandler(queue_handler)
+
+    global _file_log_listener
+    _file_log_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _file_log_listener.start()
 
     console_handler = logging.StreamHandler()
     console_handler.setLevel(level)
@@ -68,6 +148,22 @@ def setup_logging():
 
     logger.info("SMAT Logging initialized - Level: %s", config_level)
 
+
+def flush_log_file() -> None:
+    """Writes the queued and buffered records of the log file handler to the file."""
+    if _file_log_listener is not None:
+        # Stopping the listener waits until it has handled every queued record; records logged meanwhile stay queued
+        _file_log_listener.stop()
+        for handler in _file_log_listener.handlers:
+            handler.flush()
+        _file_log_listener.start()
+
+
+atexit.register(_stop_file_log_listener)
+
+
+# Resolved from the working directory SMAT was started in, which does not change afterwards
+@functools.lru_cache(maxsize=1)
 def get_base_output_path() -> str:
     current_dir = os.getcwd()
     base_dir = current_dir.replace("/nimrod/proj", "") if "/nimrod/proj" in current_dir else current_dir
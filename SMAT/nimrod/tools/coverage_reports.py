@@ -0,0 +1,38 @@
+"""
+Writes several coverage JSON reports from one coverage data file.
+
+Usage:
+    python -m nimrod.tools.coverage_reports DATA_FILE CONTEXTS OUTPUT [CONTEXTS OUTPUT ...]
+
+The data file is loaded once, and one JSON report is written to each OUTPUT with only
+the lines run in the contexts matching the comma-separated regular expressions in CONTEXTS,
+as `coverage json --contexts CONTEXTS -o OUTPUT` would.
+Runs in the directory of the measured code, so the reported file names are relative to it.
+"""
+import sys
+
+from coverage import Coverage
+
+
+def main(argv):
+    data_file, *reports = argv
+    if not reports or len(reports) % 2:
+        print(__doc__, file=sys.stderr)
+        return 2
+
+    coverage = Coverage(data_file=data_file)
+    coverage.load()
+
+    exit_code = 0
+    for contexts, output in zip(reports[::2], reports[1::2]):
+        # A report that cannot be written is left out, without stopping the others
+        try:
+            coverage.json_report(outfile=output, contexts=contexts.split(","))
+        except Exception as e:
+            print(f"{output}: {type(e).__name__}: {e}", file=sys.stderr)
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,60 @@
+import json
+from typing import Dict
+
+
+class ResultCollector:
+    """
+    pytest plugin that records the outcome of every test by nodeid, so results
+    do not have to be parsed back from the console output.
+
+    Loaded with `-p nimrod.tools.pytest_results --smat-report=<file>`, this module
+    registers a collector and writes its results to the given file as JSON.
+    """
+
+    def __init__(self) -> None:
+        self.results: Dict[str, Dict[str, str]] = {}
+
+    def pytest_runtest_logreport(self, report) -> None:
+        if report.when == "call":
+            self._record(report, report.outcome)
+        elif report.failed:
+            # Failures outside the test body (fixtures, setup, teardown) are errors, as in pytest's own summary
+            self._record(report, "error")
+        elif report.skipped:
+            self._record(report, "skipped")
+
+    def pytest_collectreport(self, report) -> None:
+        # A module that cannot be collected is reported by its file nodeid, without any test name
+        if report.failed:
+            self._record(report, "error")
+
+    def _record(self, report, outcome: str) -> None:
+        if self.results.get(report.nodeid, {}).get("outcome") == "error":
+            return
+
+        message = ""
+        if report.failed:
+            # Prefer the exception line, like the short test summary shows it
+            reprcrash = getattr(report.longrepr, "reprcrash", None)
+            message = getattr(reprcrash, "message", None) or report.longreprtext
+
+        self.results[report.nodeid] = {"outcome": outcome, "message": message}
+
+
+def pytest_addoption(parser) -> None:
+    parser.addoption("--smat-report", action="store", default=None, help="write the outcome of every test as JSON to this file")
+
+
+def pytest_configure(config) -> None:
+    report_file = config.getoption("--smat-report")
+    # xdist workers forward their reports to the controller, which writes the file
+    if report_file and not hasattr(config, "workerinput"):
+        config._smat_result_collector = ResultCollector()
+        config.pluginmanager.register(config._smat_result_collector, "smat_result_collector")
+
+
+def pytest_unconfigure(config) -> None:
+    collector = getattr(config, "_smat_result_collector", None)
+    if collector is not None:
+        with open(config.getoption("--smat-report"), "w", encoding="utf-8") as report_file:
+            json.dump(collector.results, report_file)
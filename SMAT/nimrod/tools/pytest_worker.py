@@ -0,0 +1,95 @@
+"""
+Long-lived pytest worker.
+
+Imports pytest once and then reads one JSON job per line from stdin:
+    {"args": [...], "cwd": "...", "env": {...}, "timeout": 300}
+and answers each job with one JSON line on stdout:
+    {"exit_code": 0, "results": {nodeid: {"outcome": ..., "message": ...}}}
+or {"error": "..."} when the job could not be run.
+
+Every job runs in a forked child, so test modules and the classes under test are
+imported fresh for each job while the interpreter, pytest and its builtin plugins
+are imported once.
+Requires os.fork, i.e. a POSIX platform.
+"""
+import importlib
+import json
+import os
+import signal
+import sys
+
+import pytest
+from _pytest.config import default_plugins
+
+from nimrod.tools.pytest_results import ResultCollector
+
+
+def _run_job_in_child(job, result_fd):
+    try:
+        # The worker's stdout carries the protocol, so pytest's console output is discarded
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+
+        os.chdir(job["cwd"])
+        os.environ.clear()
+        os.environ.update(job["env"])
+        # PYTHONPATH and PYTHONDONTWRITEBYTECODE are only read at interpreter startup, so they are applied by hand
+        sys.path[:0] = [p for p in job["env"].get("PYTHONPATH", "").split(os.pathsep) if p]
+        sys.dont_write_bytecode = bool(job["env"].get("PYTHONDONTWRITEBYTECODE"))
+
+        # The child dies on SIGALRM, which the worker reports as a timeout
+        signal.alarm(int(job.get("timeout", 0)))
+
+        collector = ResultCollector()
+        exit_code = pytest.main(job["args"], plugins=[collector])
+        response = {"exit_code": int(exit_code), "results": collector.results}
+    except BaseException as e:
+        response = {"error": f"{type(e).__name__}: {e}"}
+
+    with os.fdopen(result_fd, "w", encoding="utf-8") as result_file:
+        json.dump(response, result_file)
+    os._exit(0)
+
+
+def run_job(job):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        _run_job_in_child(job, write_fd)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "r", encoding="utf-8") as result_file:
+        output = result_file.read()
+    _, status = os.waitpid(pid, 0)
+
+    if not output:
+        if os.WIFSIGNALED(status) and os.WTERMSIG(status) == signal.SIGALRM:
+            return {"error": f"pytest timed out after {job.get('timeout')} seconds"}
+        return {"error": f"pytest worker child exited with status {status}"}
+    return json.loads(output)
+
+
+def preload_pytest_plugins():
+    # pytest imports its builtin plugins (and pdb, unittest, xml...) in every session;
+    # importing them here once means forked children find them already loaded
+    for name in default_plugins:
+        importlib.import_module(f"_pytest.{name}")
+
+
+def main():
+    preload_pytest_plugins()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            response = run_job(json.loads(line))
+        except Exception as e:
+            response = {"error": f"{type(e).__name__}: {e}"}
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
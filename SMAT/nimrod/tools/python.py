@@ -1,5 +1,6 @@
 import logging
 import os
+import shutil
 import sys
 import subprocess
 
@@ -13,31 +14,38 @@ class Python:
 
     def __init__(self, python_executable=None):
         self.python_executable = python_executable or sys.executable
+        # Copied from os.environ once; every get_env call starts from a cheap copy of this dict
+        self._base_env = os.environ.copy()
+        self._base_env['PYTHONPATH'] = self._base_env.get('PYTHONPATH', '') + os.pathsep + os.getcwd()
         self._check()
 
     def _check(self):
-        """Check if Python executable is available."""
-        try:
-            self._version()
-        except FileNotFoundError:
+        """Check if Python executable is available, without starting it."""
+        executable = self.python_executable
+        if not (os.path.isfile(executable) and os.access(executable, os.X_OK)) and shutil.which(executable) is None:
             logging.error(f"Python executable not found: {self.python_executable}")
             raise SystemExit()
 
     def _version(self):
         """Get Python version."""
-        return self.simple_exec('-V')
+        # The version is printed on stdout, so stderr is not captured
+        return self.simple_exec('-V', capture_stderr=False)
 
-    def simple_exec(self, *args):
+    def simple_exec(self, *args, capture_stdout=True, capture_stderr=True, decode=True):
         """Execute Python with simple arguments."""
-        return self.exec_python(None, self.get_env(), TIMEOUT, *args)
+        return self.exec_python(None, self.get_env(), TIMEOUT, *args, capture_stdout=capture_stdout, capture_stderr=capture_stderr, decode=decode)
 
-    def exec_python(self, cwd, env, timeout, *args):
+    def exec_python(self, cwd, env, timeout, *args, capture_stdout=True, capture_stderr=True, decode=True):
         """Execute Python command."""
-        return self._exec(self.python_executable, cwd, env, timeout, *args)
+        return self._exec(self.python_executable, cwd, env, timeout, *args, capture_stdout=capture_stdout, capture_stderr=capture_stderr, decode=decode)
 
     @staticmethod
-    def _exec(program, cwd, env, timeout, *args):
-        """Execute command with subprocess."""
+    def _exec(program, cwd, env, timeout, *args, capture_stdout=True, capture_stderr=True, decode=True):
+        """
+        Execute command with subprocess.
+        Output that is not captured is discarded; captured output is decoded only when it is raised,
+        or returned with decode=True. With decode=False the stdout bytes are returned as they are.
+        """
         try:
             command = [program] + list(args)
             
@@ -48,14 +56,14 @@ class Python:
                 cwd=cwd,
                 env=env,
                 timeout=timeout,
-                capture_output=True,
-                text=True
+                stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+                stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL
             )
             
             if result.returncode != 0:
-                raise subprocess.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
+                raise subprocess.CalledProcessError(result.returncode, command, Python._decode(result.stdout), Python._decode(result.stderr))
                 
-            return result.stdout
+            return Python._decode(result.stdout) if decode else result.stdout
             
         except subprocess.CalledProcessError as e:
             logging.error(f"Python command failed: {e}")
@@ -67,10 +75,14 @@ class Python:
             logging.error(f'[ERROR] {program}: not found.')
             raise e
 
+    @staticmethod
+    def _decode(output):
+        """Decode captured output; None when it was not captured."""
+        return output.decode('utf-8', 'replace') if output is not None else None
+
     def get_env(self, variables=None):
-        """Get environment variables for Python execution."""
-        env = os.environ.copy()
-        env['PYTHONPATH'] = env.get('PYTHONPATH', '') + os.pathsep + os.getcwd()
+        """Get environment variables for Python execution, as a new dict the caller may modify."""
+        env = dict(self._base_env)
         
         if variables:
             for key, value in variables.items():
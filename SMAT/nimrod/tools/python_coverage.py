@@ -1,25 +1,59 @@
 import os
+import shutil
 import subprocess
 import glob
+import importlib.util
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import logging
-from nimrod.utils import save_json, load_json
+import re
+from typing import Dict
+from nimrod.utils import generate_python_path, save_json, load_json
+
+# Directory containing the nimrod package, so pytest can load the nimrod.tools.pytest_results plugin
+NIMROD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
 class PythonCoverage:
     """
     Python coverage analysis.
     """
+
+    # Python executables known to have pytest-cov, shared by all instances
+    _coverage_installed: Dict[str, bool] = {}
     
     def __init__(self, python_executor):
         self.python = python_executor
+        # Created on first use and kept for later calls; its threads only wait on pytest subprocesses
+        self._executor = None
+
+    def _get_executor(self):
+        """Thread pool running the coverage subprocesses in parallel."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        return self._executor
 
     def install_coverage(self):
         """Install pytest-cov if not available."""
+        executable = self.python.python_executable
+        if self._coverage_installed.get(executable):
+            return True
+        
+        # The current interpreter is checked in-process; any other one with a plain import before falling back to pip
+        if executable == sys.executable:
+            installed = importlib.util.find_spec('pytest_cov') is not None
+        else:
+            installed = subprocess.run([executable, '-c', 'import pytest_cov'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+        if installed:
+            self._coverage_installed[executable] = True
+            return True
+        
         try:
             subprocess.check_call([
-                self.python.python_executable, '-m', 'pip', 'install', 'pytest-cov'
+                executable, '-m', 'pip', 'install', 'pytest-cov'
             ])
+            self._coverage_installed[executable] = True
             return True
         except subprocess.CalledProcessError as e:
             logging.error(f"Failed to install pytest-cov: {e}")
@@ -27,8 +61,9 @@ class PythonCoverage:
         except ImportError:
             try:
                 subprocess.check_call([
-                    self.python.python_executable, '-m', 'pip', 'install', 'pytest-cov'
+                    executable, '-m', 'pip', 'install', 'pytest-cov'
                 ])
+                self._coverage_installed[executable] = True
                 return True
             except subprocess.CalledProcessError as e:
                 logging.error(f"Failed to install pytest-cov: {e}")
@@ -93,32 +128,25 @@ class PythonCoverage:
         if '_' in target_name:
             class_name = target_name.split('_')[0]
         elif target_name in ['base', 'left', 'right', 'merge']:
-            # Find class name from test files
-            test_files = glob.glob(os.path.join(test_suite_path, "*Test_*.py"))
-            if test_files:
-                first_test = os.path.basename(test_files[0])
-                if 'Test_' in first_test:
-                    class_name = first_test.split('Test_')[0]
-                else:
-                    # Extract from any .py file that's not a test file
-                    py_files = glob.glob(os.path.join(test_suite_path, "*.py"))
-                    for py_file in py_files:
-                        base_name = os.path.splitext(os.path.basename(py_file))[0]
-                        if not base_name.endswith('Test') and not base_name.startswith('test'):
-                            class_name = base_name
-                            break
-                    else:
-                        raise ValueError("Could not determine class name from test suite directory")
-            else:
-                # Look for any non-test Python file
-                py_files = glob.glob(os.path.join(test_suite_path, "*.py"))
-                for py_file in py_files:
-                    base_name = os.path.splitext(os.path.basename(py_file))[0]
-                    if not base_name.endswith('Test') and not base_name.startswith('test'):
-                        class_name = base_name
+            # Find class name from test files, else from any non-test Python file, in one directory pass
+            class_name = None
+            candidate_file = None
+            with os.scandir(test_suite_path) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('.') or not name.endswith('.py'):
+                        continue
+                    base_name = name[:-3]
+                    if 'Test_' in base_name:
+                        class_name = name.split('Test_')[0]
                         break
-                else:
+                    if candidate_file is None and not base_name.endswith('Test') and not base_name.startswith('test'):
+                        candidate_file = base_name
+            
+            if class_name is None:
+                if candidate_file is None:
                     raise ValueError("Could not determine class name from test suite directory")
+                class_name = candidate_file
         else:
             class_name = target_name
         
@@ -137,55 +165,87 @@ class PythonCoverage:
         return output_dir
 
     def _setup_merge_file(self, merge_file, main_file, backup_file):
-        """Backup original and copy merge file."""
+        """Backup original and link merge file in its place; no bytes are copied unless links are unsupported."""
+        if not os.path.exists(merge_file):
+            return
+        
         if os.path.exists(main_file):
-            import shutil
-            shutil.copy2(main_file, backup_file)
+            os.replace(main_file, backup_file)
         
-        if os.path.exists(merge_file):
-            import shutil
+        try:
+            os.link(merge_file, main_file)
+        except OSError:
             shutil.copy2(merge_file, main_file)
 
     def _map_conflicted_tests_to_files(self, conflicted_tests, test_suite_path, class_name):
         """Map conflicted test names to actual test files."""
+        # Globbing relative to the suite directory yields the file names directly, with no joins or basename calls
         # First try LLM pattern: {class_name}Test_*.py
-        all_test_files = glob.glob(os.path.join(test_suite_path, f"{class_name}Test_*.py"))
+        test_basenames = glob.glob(f"{class_name}Test_*.py", root_dir=test_suite_path)
         
         # If no files found, try Pynguin pattern: test_*.py
-        if not all_test_files:
-            all_test_files = glob.glob(os.path.join(test_suite_path, "test_*.py"))
-            logging.debug(f"Using Pynguin test pattern, found {len(all_test_files)} test files")
+        if not test_basenames:
+            test_basenames = glob.glob("test_*.py", root_dir=test_suite_path)
+            logging.debug(f"Using Pynguin test pattern, found {len(test_basenames)} test files")
         else:
-            logging.debug(f"Using LLM test pattern, found {len(all_test_files)} test files")
+            logging.debug(f"Using LLM test pattern, found {len(test_basenames)} test files")
+        
+        basename_set = set(test_basenames)
+        has_pynguin_files = any(b.startswith('test_') for b in test_basenames)
         
         test_file_mapping = {}
+        # Conflicted tests of the same test class map to the same file, so each class is only looked up once
+        file_by_test_class = {}
         
         for conflicted_test in conflicted_tests:
             test_class_part = conflicted_test.split('#')[0] if '#' in conflicted_test else conflicted_test
-            logging.info(f"Looking for test class: {test_class_part}")
             
-            for test_file in all_test_files:
-                test_basename = os.path.basename(test_file)
-                if test_class_part in test_basename:
-                    test_file_mapping[conflicted_test] = test_basename
-                    break
-            else:
-                # For Pynguin tests, if no exact match, map to the first available test file
-                if all_test_files and any(f.startswith('test_') for f in [os.path.basename(f) for f in all_test_files]):
-                    test_file_mapping[conflicted_test] = os.path.basename(all_test_files[0])
-                    logging.debug(f"Mapped {conflicted_test} to first available Pynguin test file: {os.path.basename(all_test_files[0])}")
+            if test_class_part not in file_by_test_class:
+                logging.info(f"Looking for test class: {test_class_part}")
+                # Test classes are named after their files, so an exact match needs no scan
+                if f"{test_class_part}.py" in basename_set:
+                    file_by_test_class[test_class_part] = f"{test_class_part}.py"
                 else:
-                    logging.warning(f"Could not find test file for: {conflicted_test}")
+                    file_by_test_class[test_class_part] = next((b for b in test_basenames if test_class_part in b), None)
+            
+            test_basename = file_by_test_class[test_class_part]
+            if test_basename is not None:
+                test_file_mapping[conflicted_test] = test_basename
+            # For Pynguin tests, if no exact match, map to the first available test file
+            elif has_pynguin_files:
+                test_file_mapping[conflicted_test] = test_basenames[0]
+                logging.debug(f"Mapped {conflicted_test} to first available Pynguin test file: {test_basenames[0]}")
+            else:
+                logging.warning(f"Could not find test file for: {conflicted_test}")
         return test_file_mapping
 
     def _run_individual_coverage(self, test_file_mapping, test_suite_path, class_name, output_dir):
         """Run coverage for each conflicted test individually."""
         coverage_results = {}
-        env = os.environ.copy()
-        env['PYTHONPATH'] = test_suite_path
+        # Built from the Python tool's prebuilt environment instead of copying os.environ again.
+        # Only pytest-cov is needed, so installed plugins are not autoloaded, and the linked merge file
+        # keeps its own mtime, so bytecode cached for the original class file could be reused
+        env = self.python.get_env({
+            'PYTHONPATH': test_suite_path,
+            'PYTEST_DISABLE_PLUGIN_AUTOLOAD': '1',
+            'PYTHONDONTWRITEBYTECODE': '1'
+        })
         
+        # Conflicted tests are mapped to whole test files, so tests sharing a file share one coverage run
+        test_cases_by_file = {}
         for test_case, test_file in test_file_mapping.items():
-            logging.info(f"Running coverage for: {test_case}")
+            test_cases_by_file.setdefault(test_file, []).append(test_case)
+        
+        # Several test files are measured in one pytest session and split by test context afterwards
+        if len(test_cases_by_file) > 1:
+            combined_results = self._run_combined_coverage(test_cases_by_file, test_suite_path, class_name, output_dir, env)
+            if combined_results is not None:
+                return combined_results
+        
+        # The runs are independent, so they are started together and collected as they finish
+        futures = {}
+        for test_file, test_cases in test_cases_by_file.items():
+            logging.info(f"Running coverage for: {', '.join(test_cases)}")
             
             # Create coverage output files
             coverage_json = os.path.join(output_dir, f'coverage_{test_file}.json')
@@ -193,6 +253,10 @@ class PythonCoverage:
             # Run pytest with coverage
             pytest_cmd = [
                 self.python.python_executable, '-m', 'pytest',
+                '-p', 'pytest_cov.plugin',
+                '-p', 'no:cacheprovider',
+                '--no-header',
+                '--no-summary',
                 '--cov-report=json:' + coverage_json,
                 '--cov', class_name,
                 '--cov-branch',
@@ -200,27 +264,125 @@ class PythonCoverage:
                 '-v'
             ]
             
-            result = subprocess.run(
+            # Parallel runs must not share the default .coverage data file in the suite directory
+            run_env = {**env, 'COVERAGE_FILE': os.path.join(output_dir, f'.coverage_{test_file}')}
+            
+            future = self._get_executor().submit(
+                subprocess.run,
                 pytest_cmd,
                 cwd=test_suite_path,
-                env=env,
+                env=run_env,
                 capture_output=True,
                 text=True,
                 timeout=300
             )
+            futures[future] = (test_file, test_cases, coverage_json)
+        
+        for future in as_completed(futures):
+            test_file, test_cases, coverage_json = futures[future]
+            result = future.result()
             
             # Load and store coverage data
             coverage_data = self._load_coverage_json(coverage_json)
-            coverage_results[test_case] = {
-                'test_file': test_file,
-                'coverage_data': coverage_data,
-                'success': result.returncode == 0,
-                'stdout': result.stdout,
-                'stderr': result.stderr
-            }
-            
             status = "Success" if result.returncode == 0 else "Failed"
-            logging.info(f"Coverage for {test_case}: {status}")
+            for test_case in test_cases:
+                coverage_results[test_case] = {
+                    'test_file': test_file,
+                    'coverage_data': coverage_data,
+                    'success': result.returncode == 0,
+                    'stdout': result.stdout,
+                    'stderr': result.stderr
+                }
+                logging.info(f"Coverage for {test_case}: {status}")
+        
+        return coverage_results
+
+    def _run_combined_coverage(self, test_cases_by_file, test_suite_path, class_name, output_dir, env):
+        """
+        Run coverage for all test files in a single pytest session, recording which test executed each line,
+        and write one coverage JSON report per test file from that data.
+        Returns None if the session could not record test contexts, so the files can be run one by one.
+        """
+        logging.info(f"Running coverage for {len(test_cases_by_file)} test files in a single session")
+        
+        data_file = os.path.join(output_dir, '.coverage_combined')
+        results_file = os.path.join(output_dir, 'combined_test_results.json')
+        for stale_file in (data_file, results_file):
+            if os.path.exists(stale_file):
+                os.remove(stale_file)
+        
+        run_env = {
+            **env,
+            'COVERAGE_FILE': data_file,
+            'PYTHONPATH': generate_python_path([env.get('PYTHONPATH'), NIMROD_ROOT])
+        }
+        
+        # No report is written by pytest-cov; the per-file reports are created from the data file below
+        pytest_cmd = [
+            self.python.python_executable, '-m', 'pytest',
+            '-p', 'pytest_cov.plugin',
+            '-p', 'no:cacheprovider',
+            '--no-header',
+            '--no-summary',
+            '-p', 'nimrod.tools.pytest_results',
+            f'--smat-report={results_file}',
+            '--cov-report=',
+            '--cov', class_name,
+            '--cov-branch',
+            '--cov-context=test',
+            *test_cases_by_file,
+            '-v'
+        ]
+        
+        result = subprocess.run(
+            pytest_cmd,
+            cwd=test_suite_path,
+            env=run_env,
+            capture_output=True,
+            text=True,
+            timeout=300 * len(test_cases_by_file)
+        )
+        
+        if not os.path.exists(data_file) or not os.path.exists(results_file):
+            logging.warning(f"Combined coverage run failed, running test files one by one: {result.stderr or result.stdout}")
+            return None
+        
+        test_outcomes = load_json(results_file)
+        
+        # Each report keeps the lines run at import time (empty context) and those run by the tests of its file;
+        # all of them are written by a single process that loads the data file once
+        coverage_jsons = {test_file: os.path.join(output_dir, f'coverage_{test_file}.json') for test_file in test_cases_by_file}
+        reports_cmd = [self.python.python_executable, '-m', 'nimrod.tools.coverage_reports', data_file]
+        for test_file, coverage_json in coverage_jsons.items():
+            reports_cmd += [f'^$,^{re.escape(test_file)}::', coverage_json]
+        
+        reports_result = subprocess.run(
+            reports_cmd,
+            cwd=test_suite_path,
+            env=run_env,
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        if reports_result.returncode != 0:
+            logging.warning(f"Could not write every coverage JSON report: {reports_result.stderr}")
+        
+        coverage_results = {}
+        for test_file, coverage_json in coverage_jsons.items():
+            # A file succeeds, as its own run would have, when it has tests and none of them failed
+            file_outcomes = [outcome['outcome'] for nodeid, outcome in test_outcomes.items() if nodeid.startswith(f"{test_file}::")]
+            success = bool(file_outcomes) and not any(outcome in ('failed', 'error') for outcome in file_outcomes)
+            
+            coverage_data = self._load_coverage_json(coverage_json)
+            for test_case in test_cases_by_file[test_file]:
+                coverage_results[test_case] = {
+                    'test_file': test_file,
+                    'coverage_data': coverage_data,
+                    'success': success,
+                    'stdout': result.stdout,
+                    'stderr': result.stderr
+                }
+                logging.info(f"Coverage for {test_case}: {'Success' if success else 'Failed'}")
         
         return coverage_results
 
@@ -244,62 +406,67 @@ class PythonCoverage:
             
             if test_name in coverage_results:
                 coverage_data = coverage_results[test_name]['coverage_data']
-                files = coverage_data.get('files', {})
-                for file_path, file_data in files.items():
-                    if file_path.endswith('.py'):
-                        summary_data = file_data.get('summary', {})
-                        
-                        # Calculate line coverage
-                        executed_lines = file_data.get('executed_lines', [])
-                        missing_lines = file_data.get('missing_lines', [])
-                        total_statements = summary_data.get('num_statements', 0)
-                        covered_statements = summary_data.get('covered_lines', 0)
-                        line_coverage_percent = summary_data.get('percent_statements_covered', 0)
-                        
-                        # Calculate branch coverage
-                        total_branches = summary_data.get('num_branches', 0)
-                        covered_branches = summary_data.get('covered_branches', 0)
-                        branch_coverage_percent = summary_data.get('percent_branches_covered', 0)
-                        
-                        test_entry['coverage_data'] = {
-                            'line_coverage': {
-                                'percent': line_coverage_percent,
-                                'covered_statements': covered_statements,
-                                'total_statements': total_statements,
-                                'executed_lines': executed_lines,
-                                'missing_lines': missing_lines
-                            },
-                            'branch_coverage': {
-                                'percent': branch_coverage_percent,
-                                'covered_branches': covered_branches,
-                                'total_branches': total_branches,
-                                'executed_branches': file_data.get('executed_branches', []),
-                                'missing_branches': file_data.get('missing_branches', [])
-                            },
-                            'overall_coverage_percent': summary_data.get('percent_covered', 0)
-                        }
-                        break
+                # _load_coverage_json only keeps the entry of the covered class file, so it is taken directly
+                file_data = next(iter(coverage_data.get('files', {}).values()), None)
+                if file_data is not None:
+                    summary_data = file_data.get('summary', {})
+                    
+                    # Calculate line coverage
+                    executed_lines = file_data.get('executed_lines', [])
+                    missing_lines = file_data.get('missing_lines', [])
+                    total_statements = summary_data.get('num_statements', 0)
+                    covered_statements = summary_data.get('covered_lines', 0)
+                    line_coverage_percent = summary_data.get('percent_statements_covered', 0)
+                    
+                    # Calculate branch coverage
+                    total_branches = summary_data.get('num_branches', 0)
+                    covered_branches = summary_data.get('covered_branches', 0)
+                    branch_coverage_percent = summary_data.get('percent_branches_covered', 0)
+                    
+                    test_entry['coverage_data'] = {
+                        'line_coverage': {
+                            'percent': line_coverage_percent,
+                            'covered_statements': covered_statements,
+                            'total_statements': total_statements,
+                            'executed_lines': executed_lines,
+                            'missing_lines': missing_lines
+                        },
+                        'branch_coverage': {
+                            'percent': branch_coverage_percent,
+                            'covered_branches': covered_branches,
+                            'total_branches': total_branches,
+                            'executed_branches': file_data.get('executed_branches', []),
+                            'missing_branches': file_data.get('missing_branches', [])
+                        },
+                        'overall_coverage_percent': summary_data.get('percent_covered', 0)
+                    }
             
             unified_report['conflicted_tests_coverage'].append(test_entry)
         
-        # Save unified report
+        # Save unified report; these options let save_json write it with orjson when available
         unified_file = os.path.join(output_dir, 'unified_conflicts_coverage.json')
-        save_json(unified_file, unified_report)
+        save_json(unified_file, unified_report, ensure_ascii=False, indent=2)
         return unified_report
 
     def _restore_original_file(self, main_file, backup_file):
         """Restore original file from backup."""
         if os.path.exists(backup_file):
-            import shutil
-            shutil.copy2(backup_file, main_file)
-            os.remove(backup_file)
+            os.replace(backup_file, main_file)
 
     def _load_coverage_json(self, coverage_json_file):
-        """Load coverage data from pytest-cov JSON report."""
+        """
+        Load coverage data from pytest-cov JSON report.
+        Only the entry of the first Python file is kept, as it is the only one the unified report reads.
+        """
         try:
             if os.path.exists(coverage_json_file):
+                # load_json decodes the raw bytes with orjson when it is installed
                 coverage_data = load_json(coverage_json_file)
-                return coverage_data
+                files = coverage_data.get('files', {})
+                for file_path, file_data in files.items():
+                    if file_path.endswith('.py'):
+                        return {'files': {file_path: file_data}}
+                return {'files': {}}
             else:
                 logging.warning(f"Coverage JSON file not found: {coverage_json_file}")
                 return {}
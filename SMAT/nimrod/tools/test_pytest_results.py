@@ -0,0 +1,81 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, skipUnless
+
+from nimrod.utils import generate_python_path
+
+PYTEST_AVAILABLE = importlib.util.find_spec("pytest") is not None
+
+# Directory containing the nimrod package, so pytest can load the plugin
+NIMROD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_FILE = """
+import pytest
+
+class TestApply:
+    def test_discount(self):
+        assert True
+
+class TestApplyTwice:
+    def test_discount(self):
+        assert 90 == 81
+
+@pytest.fixture
+def broken():
+    raise RuntimeError("fixture failed")
+
+def test_with_broken_fixture(broken):
+    pass
+
+@pytest.mark.skip
+def test_skipped():
+    pass
+"""
+
+
+@skipUnless(PYTEST_AVAILABLE, "the results plugin needs pytest")
+class TestPytestResults(TestCase):
+    def setUp(self):
+        self.suite_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.suite_dir.cleanup)
+        self.report_file = os.path.join(self.suite_dir.name, "report.json")
+
+    def run_pytest(self, files):
+        for name, content in files.items():
+            with open(os.path.join(self.suite_dir.name, name), "w", encoding="utf-8") as test_file:
+                test_file.write(content)
+
+        subprocess.run(
+            [sys.executable, "-m", "pytest", *files, "-p", "no:cacheprovider", "--continue-on-collection-errors", "-p", "nimrod.tools.pytest_results", f"--smat-report={self.report_file}"],
+            cwd=self.suite_dir.name,
+            env=dict(os.environ, PYTEST_DISABLE_PLUGIN_AUTOLOAD="1", PYTHONPATH=generate_python_path([NIMROD_ROOT, os.environ.get("PYTHONPATH")])),
+            capture_output=True,
+            timeout=120
+        )
+        with open(self.report_file, encoding="utf-8") as report_file:
+            return json.load(report_file)
+
+    def test_reports_every_test_by_nodeid(self):
+        report = self.run_pytest({"test_sample.py": TEST_FILE})
+
+        self.assertEqual(report["test_sample.py::TestApply::test_discount"]["outcome"], "passed")
+        self.assertEqual(report["test_sample.py::TestApplyTwice::test_discount"]["outcome"], "failed")
+        self.assertIn("assert 90 == 81", report["test_sample.py::TestApplyTwice::test_discount"]["message"])
+        self.assertEqual(report["test_sample.py::test_skipped"]["outcome"], "skipped")
+
+    def test_reports_failures_outside_the_test_body_as_errors(self):
+        report = self.run_pytest({"test_sample.py": TEST_FILE})
+
+        self.assertEqual(report["test_sample.py::test_with_broken_fixture"]["outcome"], "error")
+        self.assertIn("fixture failed", report["test_sample.py::test_with_broken_fixture"]["message"])
+
+    def test_reports_a_file_that_cannot_be_collected_by_its_file_nodeid(self):
+        report = self.run_pytest({"test_sample.py": TEST_FILE, "test_broken.py": "def test_broken(:\n"})
+
+        self.assertEqual(report["test_broken.py"]["outcome"], "error")
+        self.assertIn("SyntaxError", report["test_broken.py"]["message"])
+        self.assertEqual(report["test_sample.py::TestApply::test_discount"]["outcome"], "passed")
@@ -0,0 +1,83 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, skipUnless
+
+from nimrod.utils import generate_python_path
+
+PYTEST_AVAILABLE = importlib.util.find_spec("pytest") is not None
+if PYTEST_AVAILABLE and hasattr(os, "fork"):
+    from nimrod.tools import pytest_worker
+
+# Directory containing the nimrod package, so the worker can be started as a module
+NIMROD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_FILE = """
+import time
+
+def test_passes():
+    assert True
+
+def test_fails():
+    assert 1 == 2
+
+def test_sleeps():
+    time.sleep(30)
+"""
+
+
+@skipUnless(PYTEST_AVAILABLE and hasattr(os, "fork"), "the pytest worker needs pytest and os.fork")
+class TestPytestWorker(TestCase):
+    def setUp(self):
+        self.suite_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.suite_dir.cleanup)
+        with open(os.path.join(self.suite_dir.name, "test_sample.py"), "w", encoding="utf-8") as test_file:
+            test_file.write(TEST_FILE)
+
+    def get_job(self, *tests, timeout=60):
+        args = [f"test_sample.py::{test}" for test in tests] + ["-p", "no:cacheprovider"]
+        return {"args": args, "cwd": self.suite_dir.name, "env": dict(os.environ), "timeout": timeout}
+
+    def test_reports_the_outcome_of_every_test_by_nodeid(self):
+        response = pytest_worker.run_job(self.get_job("test_passes", "test_fails"))
+
+        self.assertEqual(response["exit_code"], 1)
+        self.assertEqual(response["results"]["test_sample.py::test_passes"]["outcome"], "passed")
+        self.assertEqual(response["results"]["test_sample.py::test_fails"]["outcome"], "failed")
+        self.assertIn("assert 1 == 2", response["results"]["test_sample.py::test_fails"]["message"])
+
+    def test_reports_an_error_when_the_session_times_out(self):
+        response = pytest_worker.run_job(self.get_job("test_sleeps", timeout=1))
+
+        self.assertNotIn("results", response)
+        self.assertIn("timed out", response["error"])
+
+    def test_runs_the_session_in_the_job_directory_without_changing_the_worker(self):
+        cwd = os.getcwd()
+
+        pytest_worker.run_job(self.get_job("test_passes"))
+
+        self.assertEqual(os.getcwd(), cwd)
+
+    def test_answers_one_line_per_job_and_skips_blank_lines(self):
+        env = dict(os.environ, PYTHONPATH=generate_python_path([NIMROD_ROOT, os.environ.get("PYTHONPATH")]))
+        jobs = [json.dumps(self.get_job("test_passes")), "", "not json", json.dumps(self.get_job("test_fails"))]
+
+        worker = subprocess.run(
+            [sys.executable, "-m", "nimrod.tools.pytest_worker"],
+            input="\n".join(jobs) + "\n",
+            capture_output=True,
+            text=True,
+            env=env,
+            timeout=120
+        )
+        responses = [json.loads(line) for line in worker.stdout.splitlines()]
+
+        self.assertEqual(worker.returncode, 0)
+        self.assertEqual(len(responses), 3)
+        self.assertEqual(responses[0]["results"]["test_sample.py::test_passes"]["outcome"], "passed")
+        self.assertIn("JSONDecodeError", responses[1]["error"])
+        self.assertEqual(responses[2]["results"]["test_sample.py::test_fails"]["outcome"], "failed")
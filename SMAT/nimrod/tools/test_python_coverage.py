@@ -0,0 +1,90 @@
+import importlib.util
+import os
+import tempfile
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from nimrod.tools.python import Python
+from nimrod.tools.python_coverage import PythonCoverage
+
+COVERAGE_AVAILABLE = all(importlib.util.find_spec(module) is not None for module in ("pytest", "pytest_cov", "coverage"))
+
+CLASS_FILE = """
+class DiscountCalculator:
+    def apply(self, value):
+        if value > 100:
+            return value * 0.9
+        return value
+"""
+
+TEST_FILES = {
+    "DiscountCalculatorTest_0.py": """
+from DiscountCalculator import DiscountCalculator
+
+def test_discount():
+    assert DiscountCalculator().apply(200) == 180
+""",
+    "DiscountCalculatorTest_1.py": """
+from DiscountCalculator import DiscountCalculator
+
+def test_no_discount():
+    assert DiscountCalculator().apply(50) == 50
+"""
+}
+
+# Lines of CLASS_FILE run only by one of the test files
+DISCOUNT_LINE = 5
+NO_DISCOUNT_LINE = 6
+
+
+@skipUnless(COVERAGE_AVAILABLE, "coverage runs need pytest and pytest-cov")
+class TestPythonCoverage(TestCase):
+    def setUp(self):
+        self.suite_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.suite_dir.cleanup)
+        with open(os.path.join(self.suite_dir.name, "DiscountCalculator.py"), "w", encoding="utf-8") as class_file:
+            class_file.write(CLASS_FILE)
+        for name, source in TEST_FILES.items():
+            with open(os.path.join(self.suite_dir.name, name), "w", encoding="utf-8") as test_file:
+                test_file.write(source)
+
+        self.coverage = PythonCoverage(Python())
+        self.addCleanup(lambda: self.coverage._executor and self.coverage._executor.shutdown())
+        self.test_file_mapping = {
+            "DiscountCalculatorTest_0#test_discount": "DiscountCalculatorTest_0.py",
+            "DiscountCalculatorTest_1#test_no_discount": "DiscountCalculatorTest_1.py"
+        }
+
+    def run_coverage(self):
+        return self.coverage._run_individual_coverage(self.test_file_mapping, self.suite_dir.name, "DiscountCalculator", self.suite_dir.name)
+
+    def get_executed_lines(self, results, test_case):
+        return results[test_case]["coverage_data"]["files"]["DiscountCalculator.py"]["executed_lines"]
+
+    def assert_lines_split_by_test_file(self, results):
+        self.assertTrue(all(result["success"] for result in results.values()))
+
+        discount_lines = self.get_executed_lines(results, "DiscountCalculatorTest_0#test_discount")
+        no_discount_lines = self.get_executed_lines(results, "DiscountCalculatorTest_1#test_no_discount")
+
+        self.assertIn(DISCOUNT_LINE, discount_lines)
+        self.assertNotIn(NO_DISCOUNT_LINE, discount_lines)
+        self.assertIn(NO_DISCOUNT_LINE, no_discount_lines)
+        self.assertNotIn(DISCOUNT_LINE, no_discount_lines)
+
+    def test_splits_the_covered_lines_of_a_single_session_by_test_file(self):
+        with patch.object(self.coverage, "_get_executor", wraps=self.coverage._get_executor) as get_executor:
+            results = self.run_coverage()
+
+        self.assert_lines_split_by_test_file(results)
+        self.assertTrue(os.path.isfile(os.path.join(self.suite_dir.name, ".coverage_combined")))
+        get_executor.assert_not_called()
+
+    def test_runs_the_test_files_one_by_one_when_the_single_session_fails(self):
+        with patch.object(self.coverage, "_run_combined_coverage", return_value=None) as run_combined_coverage:
+            results = self.run_coverage()
+
+        run_combined_coverage.assert_called_once()
+        self.assert_lines_split_by_test_file(results)
+        for test_file in TEST_FILES:
+            self.assertTrue(os.path.isfile(os.path.join(self.suite_dir.name, f".coverage_{test_file}")))
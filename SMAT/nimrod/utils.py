@@ -1,5 +1,12 @@
 import os
 import json
+from pathlib import Path
+
+# orjson is listed in requirements.txt; the stdlib fallback keeps nimrod usable where it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
 
 
 def generate_python_path(paths):
@@ -11,7 +18,14 @@ def load_json(file_path, encoding="utf-8", default_value=None):
     """Loads a JSON file and return its content as a dictionary"""
     if default_value is None:
         default_value = {}
-    
+
+    # orjson only decodes UTF-8, so other encodings go through the stdlib parser
+    if orjson is not None and encoding == "utf-8":
+        try:
+            return orjson.loads(Path(file_path).read_bytes())
+        except orjson.JSONDecodeError:
+            return default_value
+
     with open(file_path, "r", encoding=encoding) as file:
         try:
             content = json.load(file)
@@ -22,5 +36,19 @@ def load_json(file_path, encoding="utf-8", default_value=None):
 
 def save_json(file_path, content, encoding="utf-8", ensure_ascii=True, indent=4):
     """Saves a dictionary as a JSON file"""
+    # orjson always writes UTF-8 and only knows 2-space indentation
+    if orjson is not None and encoding == "utf-8" and not ensure_ascii and indent in (None, 2):
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        Path(file_path).write_bytes(orjson.dumps(content, option=option))
+        return
+
     with open(file_path, "w", encoding=encoding) as file:
         json.dump(content, file, indent=indent, ensure_ascii=ensure_ascii)
+
+
+def dump_json_line(content):
+    """Serializes a dictionary as one line of UTF-8 JSON, ending with a newline, for JSON Lines files"""
+    # orjson writes compact UTF-8 without escaping non-ASCII characters, like the stdlib fallback below
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(content, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
@@ -18,13 +18,13 @@ def setup_logging():
 def run_smat():
     try:
         smat_dir = Path(__file__).parent / "SMAT"
-        os.environ['PYTHONPATH'] = str(smat_dir)
+        # Only the SMAT process gets the PYTHONPATH; this process's environment is left as it is
+        env = {**os.environ, 'PYTHONPATH': str(smat_dir)}
 
         result = subprocess.run(
             [sys.executable, "-m", "nimrod"],
             cwd=smat_dir,
-            capture_output=False,
-            text=True
+            env=env
         )
         
         if result.returncode == 0: